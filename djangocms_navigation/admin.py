@@ -1,4 +1,5 @@
-from copy import deepcopy
+from copy import copy
+from weakref import WeakKeyDictionary
 
 from django.apps import apps
 from django.conf.urls import url
@@ -6,13 +7,15 @@ from django.contrib import admin, messages
 from django.contrib.admin.utils import quote
 from django.contrib.admin.views.main import ChangeList
 from django.contrib.sites.shortcuts import get_current_site
+from django.db.models import OuterRef, Prefetch, Subquery
 from django.http import HttpResponseBadRequest, HttpResponseRedirect
 from django.shortcuts import get_object_or_404
-from django.template.loader import render_to_string
+from django.template.loader import get_template, render_to_string
 from django.urls import reverse
-from django.utils.html import format_html, format_html_join
+from django.utils.html import conditional_escape, format_html, format_html_join
+from django.utils.safestring import mark_safe
 from django.utils.text import slugify
-from django.utils.translation import ugettext_lazy as _
+from django.utils.translation import get_language, ugettext_lazy as _
 from django.views.i18n import JavaScriptCatalog
 
 from djangocms_versioning import versionables
@@ -22,7 +25,12 @@ from treebeard.admin import TreeAdmin
 from .filters import LanguageFilter
 from .forms import MenuContentForm, MenuItemForm
 from .models import Menu, MenuContent, MenuItem
-from .utils import is_versioning_enabled, purge_menu_cache, reverse_admin_name
+from .utils import (
+    get_menu_content_state,
+    is_versioning_enabled,
+    purge_menu_cache,
+    reverse_admin_name,
+)
 from .views import ContentObjectSelect2View, MenuContentPreviewView
 
 
@@ -46,12 +54,55 @@ except ImportError:
 
 
 def proxy_model(obj):
+    """Return a copy of the ``obj`` version as an instance of its proxy model.
+
+    Only the field values are copied, related objects cached on ``obj``
+    (content, author...) are shared with the copy instead of being cloned.
+    """
     versionable = versionables.for_content(MenuContent)
-    obj_ = deepcopy(obj)
-    obj_.__class__ = versionable.version_model_proxy
+    proxy_class = versionable.version_model_proxy
+    obj_ = proxy_class.__new__(proxy_class)
+    obj_.__dict__ = obj.__dict__.copy()
+    obj_._state = copy(obj._state)
+    # Related objects are cached in the state since Django 2.0, the copy
+    # gets its own cache so that caching a relation leaves ``obj`` as it is
+    if hasattr(obj._state, "fields_cache"):
+        obj_._state.fields_cache = dict(obj._state.fields_cache)
     return obj_
 
 
+ICON_URL_PLACEHOLDER = "__djangocms_navigation_icon_url__"
+
+
+# Rendered icon fragments, by loaded template so that they go away with it
+_icon_fragments = WeakKeyDictionary()
+
+
+def _get_icon_fragments(template_name, disabled, extra_context):
+    template = get_template(template_name)
+    # Backends wrap the template of their engine in a new object on each load
+    fragments = _icon_fragments.setdefault(getattr(template, "template", template), {})
+    key = (disabled, get_language(), extra_context)
+    if key not in fragments:
+        context = dict(extra_context, url=ICON_URL_PLACEHOLDER, disabled=disabled)
+        fragments[key] = tuple(template.render(context).split(ICON_URL_PLACEHOLDER))
+    return fragments[key]
+
+
+def render_icon(template_name, url, disabled=False, **extra_context):
+    """Render an admin action icon.
+
+    The icons of a changelist only differ by their url, so each loaded icon
+    template is rendered once per state and language and the url is
+    interpolated in the rendered fragments. The template loaders decide
+    when a template is loaded again, e.g. after it changed in DEBUG.
+    """
+    fragments = _get_icon_fragments(
+        template_name, disabled, tuple(sorted(extra_context.items()))
+    )
+    return mark_safe(conditional_escape(url).join(fragments))
+
+
 class MenuItemChangeList(ChangeList):
 
     def __init__(self, request, *args, **kwargs):
@@ -79,7 +130,8 @@ class MenuContentAdmin(admin.ModelAdmin):
 
     def get_version(self, obj):
         """
-        Return the latest version of a given object
+        Return the latest version of a given object, the changelist
+        queryset prefetches it so that no query is made per column
         :param obj: MenuContent instance
         :return: Latest Version linked with MenuContent instance
         """
@@ -173,9 +225,10 @@ class MenuContentAdmin(admin.ModelAdmin):
         :param disabled: Should the link be marked disabled?
         :return: Preview icon template
         """
-        return render_to_string(
+        return render_icon(
             "djangocms_navigation/admin/icons/preview.html",
-            {"url": obj.get_preview_url(), "disabled": disabled},
+            obj.get_preview_url(),
+            disabled=disabled,
         )
 
     def _get_edit_link(self, obj, request, disabled=False):
@@ -203,16 +256,17 @@ class MenuContentAdmin(admin.ModelAdmin):
             ),
             args=[obj.pk],
         )
-        return render_to_string(
-            "djangocms_versioning/admin/edit_icon.html",
-            {"url": url, "disabled": disabled, "post": False},
+        return render_icon(
+            "djangocms_versioning/admin/edit_icon.html", url, disabled=disabled, post=False
         )
 
     def _get_manage_versions_link(self, obj, request, disabled=False):
         url = version_list_url(obj)
-        return render_to_string(
+        return render_icon(
             "djangocms_navigation/admin/icons/manage_versions.html",
-            {"url": url, "disabled": disabled, "action": False},
+            url,
+            disabled=disabled,
+            action=False,
         )
 
     def get_menuitem_link(self, obj):
@@ -251,8 +305,22 @@ class MenuContentAdmin(admin.ModelAdmin):
 
     def get_queryset(self, request):
         queryset = super().get_queryset(request)
-        queryset = queryset.prefetch_related('menu').filter(
+        queryset = queryset.select_related('menu').filter(
             menu__site=get_current_site(request))
+        if is_versioning_enabled(self.model):
+            versions = Version.objects.select_related("created_by")
+            if using_version_lock:
+                # The lock of every version, and the lock of the draft of
+                # the published versions, are checked by the edit link
+                drafts = Version.objects.filter(
+                    content_type=OuterRef("content_type"),
+                    object_id=OuterRef("object_id"),
+                    state=DRAFT,
+                )
+                versions = versions.select_related("versionlock__created_by").annotate(
+                    _draft_version_user_id=Subquery(drafts.values("versionlock__created_by")[:1])
+                )
+            queryset = queryset.prefetch_related(Prefetch("versions", queryset=versions))
         return queryset
 
     def save_model(self, request, obj, form, change):
@@ -389,8 +457,6 @@ class MenuItemAdmin(TreeAdmin):
             except ConditionFailed as error:
                 messages.error(request, str(error))
                 return HttpResponseRedirect(version_list_url(menu_content))
-            # purge menu cache
-            purge_menu_cache(site_id=menu_content.menu.site_id)
         extra_context["list_url"] = reverse_admin_name(
             self.model,
             'list',
@@ -415,8 +481,6 @@ class MenuItemAdmin(TreeAdmin):
                 except ConditionFailed as error:
                     messages.error(request, str(error))
                     return HttpResponseRedirect(version_list_url(menu_content))
-                # purge menu cache
-                purge_menu_cache(site_id=menu_content.menu.site_id)
 
             extra_context["list_url"] = reverse(
                 "admin:{}_menuitem_list".format(self.model._meta.app_label),
@@ -439,8 +503,6 @@ class MenuItemAdmin(TreeAdmin):
                 except ConditionFailed as error:
                     messages.error(request, str(error))
                     return HttpResponseRedirect(version_list_url(menu_content))
-                # purge menu cache
-                purge_menu_cache(site_id=menu_content.menu.site_id)
 
             extra_context["list_url"] = reverse(
                 "admin:{}_menuitem_list".format(self.model._meta.app_label),
@@ -487,11 +549,11 @@ class MenuItemAdmin(TreeAdmin):
         return HttpResponseRedirect(url)
 
     def move_node(self, request, menu_content_id):
+        menu_content = get_object_or_404(
+            self.menu_content_model._base_manager, id=menu_content_id
+        )
         # Disallow moving of a node on anything other than a draft version
         if self._versioning_enabled:
-            menu_content = get_object_or_404(
-                self.menu_content_model._base_manager, id=menu_content_id
-            )
             request.menu_content_id = menu_content_id
             change_perm = self.has_change_permission(request, menu_content)
             if not change_perm:
@@ -511,7 +573,15 @@ class MenuItemAdmin(TreeAdmin):
             messages.error(request, message)
             return HttpResponseBadRequest(message)
 
-        return super().move_node(request)
+        response = super().move_node(request)
+        if response.status_code == 200:
+            # Moving nodes updates paths in bulk without sending signals
+            purge_menu_cache(
+                site_id=menu_content.menu.site_id,
+                menu=menu_content.menu,
+                state=get_menu_content_state(menu_content),
+            )
+        return response
 
     def has_add_permission(self, request):
         if not hasattr(request, "menu_content_id"):
@@ -7,3 +7,6 @@ from django.utils.translation import ugettext_lazy as _
 class NavigationConfig(AppConfig):
     name = "djangocms_navigation"
     verbose_name = _("django CMS Navigation")
+
+    def ready(self):
+        from . import handlers  # noqa: F401
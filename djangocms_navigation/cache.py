@@ -0,0 +1,333 @@
+import json
+import struct
+import time
+import zlib
+from itertools import accumulate
+from uuid import uuid4
+
+from django.contrib.sites.models import Site
+from django.core.cache import cache
+
+from cms.utils.conf import get_cms_setting
+from cms.utils.i18n import get_language_list
+
+from .constants import CACHE_COMPRESS_THRESHOLD, CACHE_MAX_STALENESS
+from .nodes import MenuNode
+
+
+CACHE_PREFIX = "djangocms_navigation"
+
+DRAFT_STATE = "draft"
+PUBLISHED_STATE = "published"
+
+# Format of the cached menus, entries in another format are cache misses
+PACK_FORMAT_VERSION = 1
+PACK_COMPRESSED = 1
+
+# Seconds between two reads of the menus built by another process
+WAIT_INTERVAL = 0.05
+
+
+def get_versioning_state(draft_mode_active):
+    return DRAFT_STATE if draft_mode_active else PUBLISHED_STATE
+
+
+def get_cache_duration():
+    return get_cms_setting("CACHE_DURATIONS")["menus"]
+
+
+def _get_generation_key(site_id):
+    return "{}:{}:generation".format(CACHE_PREFIX, site_id)
+
+
+def get_generation(site_id):
+    """Return the token all menu cache keys of a site are built with.
+
+    Replacing the token invalidates every cached menu of the site at
+    once. A token that was evicted from the cache is simply replaced,
+    which orphans the entries built with the previous one.
+    """
+    key = _get_generation_key(site_id)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, uuid4().hex, None)
+        generation = cache.get(key)
+    return generation
+
+
+def get_cache_key(site_id, language, identifier, state, generation):
+    return "{}:{}:{}:{}:{}:{}".format(
+        CACHE_PREFIX, site_id, generation, language, state, identifier
+    )
+
+
+def get_stale_cache_key(site_id, language, identifier, state):
+    """Return the key of the copy of a menu kept once it is no longer
+    fresh, which unlike the key of the menu is the same across generations"""
+    return "{}:{}:stale:{}:{}:{}".format(
+        CACHE_PREFIX, site_id, language, state, identifier
+    )
+
+
+def get_lock_key(site_id, language, identifier, state):
+    """Return the key of the lock held while a menu is built"""
+    return "{}:{}:lock:{}:{}:{}".format(
+        CACHE_PREFIX, site_id, language, state, identifier
+    )
+
+
+def _get_invalidation_key(site_id, identifier=None):
+    key = "{}:{}:invalidated".format(CACHE_PREFIX, site_id)
+    if identifier is not None:
+        key += ":{}".format(identifier)
+    return key
+
+
+def get_stale_cache_duration():
+    return get_cache_duration() + CACHE_MAX_STALENESS
+
+
+def serialize_nodes(nodes):
+    """Flatten the MenuNode records of a menu into plain tuples"""
+    return [node.as_tuple() for node in nodes]
+
+
+def deserialize_nodes(data):
+    return [MenuNode(*node) for node in data]
+
+
+def pack_nodes(nodes):
+    """Pack the MenuNode records of a menu into the bytes it is cached as.
+
+    The records are stored as parallel arrays: ids, indexes of parents,
+    indexes of link targets and the lengths of titles and urls, followed
+    by the text of the titles and urls. Parents outside of the menu (its
+    root) and link targets are listed once in a JSON table. The data is
+    compressed with zlib when longer than CACHE_COMPRESS_THRESHOLD bytes.
+    """
+    positions = {}
+    # The values of the tables are listed in the order of their indexes
+    external_parent_indexes = {}
+    external_parents = []
+    target_indexes_by_value = {}
+    targets = []
+    ids = []
+    parents = []
+    target_indexes = []
+    lengths = []
+    texts = []
+    for position, node in enumerate(nodes):
+        parent = positions.get(node.parent_id)
+        if parent is None:
+            if node.parent_id not in external_parent_indexes:
+                external_parent_indexes[node.parent_id] = len(external_parents)
+                external_parents.append(node.parent_id)
+            # Parents outside of the menu are stored as negative indexes
+            parent = -1 - external_parent_indexes[node.parent_id]
+        if node.link_target not in target_indexes_by_value:
+            target_indexes_by_value[node.link_target] = len(targets)
+            targets.append(node.link_target)
+        positions[node.id] = position
+        ids.append(node.id)
+        parents.append(parent)
+        target_indexes.append(target_indexes_by_value[node.link_target])
+        lengths += (len(node.title), len(node.url))
+        texts += (node.title, node.url)
+    count = len(ids)
+    tables = json.dumps([external_parents, targets]).encode()
+    body = b"".join([
+        struct.pack("<II", count, len(tables)),
+        tables,
+        struct.pack("<{}q".format(count), *ids),
+        struct.pack("<{}i".format(count), *parents),
+        struct.pack("<{}H".format(count), *target_indexes),
+        struct.pack("<{}I".format(2 * count), *lengths),
+        "".join(texts).encode(),
+    ])
+    flags = 0
+    if len(body) > CACHE_COMPRESS_THRESHOLD:
+        body = zlib.compress(body)
+        flags |= PACK_COMPRESSED
+    return struct.pack("<BB", PACK_FORMAT_VERSION, flags) + body
+
+
+def unpack_nodes(data):
+    """Return the MenuNode records packed by ``pack_nodes``, or None when
+    the data was cached in another format"""
+    if not isinstance(data, bytes) or len(data) < 2:
+        return None
+    version, flags = struct.unpack_from("<BB", data)
+    if version != PACK_FORMAT_VERSION:
+        return None
+    body = data[2:]
+    if flags & PACK_COMPRESSED:
+        body = zlib.decompress(body)
+    count, tables_length = struct.unpack_from("<II", body)
+    offset = 8
+    external_parents, targets = json.loads(body[offset:offset + tables_length].decode())
+    offset += tables_length
+    ids = struct.unpack_from("<{}q".format(count), body, offset)
+    offset += 8 * count
+    parents = struct.unpack_from("<{}i".format(count), body, offset)
+    offset += 4 * count
+    target_indexes = struct.unpack_from("<{}H".format(count), body, offset)
+    offset += 2 * count
+    lengths = struct.unpack_from("<{}I".format(2 * count), body, offset)
+    offset += 8 * count
+    text = body[offset:].decode()
+    bounds = [0]
+    bounds += accumulate(lengths)
+    strings = [text[start:end] for start, end in zip(bounds, bounds[1:])]
+    return [
+        MenuNode(
+            node_id,
+            ids[parent] if parent >= 0 else external_parents[-1 - parent],
+            title,
+            url,
+            targets[target],
+        )
+        for node_id, parent, target, title, url in zip(
+            ids, parents, target_indexes, strings[0::2], strings[1::2]
+        )
+    ]
+
+
+def get_menus(site_id, language, state, identifiers):
+    """Return the cached nodes of the given menus
+
+    :return: dict of MenuNode lists keyed by menu identifier,
+             menus which are not cached are left out
+    """
+    generation = get_generation(site_id)
+    keys = {
+        get_cache_key(site_id, language, identifier, state, generation): identifier
+        for identifier in identifiers
+    }
+    cached = cache.get_many(list(keys))
+    menus = {}
+    for key, data in cached.items():
+        nodes = unpack_nodes(data)
+        if nodes is not None:
+            menus[keys[key]] = nodes
+    return menus
+
+
+def wait_for_menus(site_id, language, state, identifiers, timeout):
+    """Wait for the given menus to be cached by another process, for at
+    most ``timeout`` seconds
+
+    :return: dict of MenuNode lists keyed by menu identifier,
+             menus which were not cached in time are left out
+    """
+    menus = {}
+    deadline = time.monotonic() + timeout
+    while True:
+        missing = [identifier for identifier in identifiers if identifier not in menus]
+        menus.update(get_menus(site_id, language, state, missing))
+        if len(menus) == len(identifiers) or time.monotonic() >= deadline:
+            return menus
+        time.sleep(WAIT_INTERVAL)
+
+
+def get_stale_menus(site_id, language, state, identifiers):
+    """Return the stale copies of the given menus, as long as they have
+    not been stale for more than CACHE_MAX_STALENESS seconds.
+
+    A menu is stale from the time it was invalidated, or from the time
+    its cache entry expired.
+
+    :return: dict of MenuNode lists keyed by menu identifier,
+             menus without a recent enough copy are left out
+    """
+    if not CACHE_MAX_STALENESS or not identifiers:
+        return {}
+    keys = {
+        get_stale_cache_key(site_id, language, identifier, state): identifier
+        for identifier in identifiers
+    }
+    site_invalidation_key = _get_invalidation_key(site_id)
+    invalidation_keys = [
+        _get_invalidation_key(site_id, identifier) for identifier in identifiers
+    ]
+    cached = cache.get_many(list(keys) + invalidation_keys + [site_invalidation_key])
+    now = time.time()
+    menus = {}
+    for key, identifier in keys.items():
+        if key not in cached:
+            continue
+        built_at, data = cached[key]
+        invalidated_at = max(
+            cached.get(site_invalidation_key, 0),
+            cached.get(_get_invalidation_key(site_id, identifier), 0),
+        )
+        if invalidated_at >= built_at:
+            stale_since = invalidated_at
+        else:
+            stale_since = built_at + get_cache_duration()
+        if now - stale_since > CACHE_MAX_STALENESS:
+            continue
+        nodes = unpack_nodes(data)
+        if nodes is not None:
+            menus[identifier] = nodes
+    return menus
+
+
+def set_menus(site_id, language, state, menus):
+    """Cache the nodes of menus given as a dict keyed by menu identifier"""
+    if not menus:
+        return
+    generation = get_generation(site_id)
+    packed_menus = {identifier: pack_nodes(nodes) for identifier, nodes in menus.items()}
+    cache.set_many(
+        {
+            get_cache_key(site_id, language, identifier, state, generation): data
+            for identifier, data in packed_menus.items()
+        },
+        get_cache_duration(),
+    )
+    if CACHE_MAX_STALENESS:
+        built_at = time.time()
+        cache.set_many(
+            {
+                get_stale_cache_key(site_id, language, identifier, state): (built_at, data)
+                for identifier, data in packed_menus.items()
+            },
+            get_stale_cache_duration(),
+        )
+
+
+def invalidate_menu(menu, state=None):
+    """Drop the cached nodes of a single menu in all languages, in the
+    given state or in all states"""
+    generation = get_generation(menu.site_id)
+    states = [state] if state else [DRAFT_STATE, PUBLISHED_STATE]
+    cache.delete_many([
+        get_cache_key(menu.site_id, language, menu.identifier, state, generation)
+        for language in get_language_list(menu.site_id)
+        for state in states
+    ])
+    if CACHE_MAX_STALENESS:
+        # The stale copies can be served from now on
+        cache.set(
+            _get_invalidation_key(menu.site_id, menu.identifier),
+            time.time(),
+            get_stale_cache_duration(),
+        )
+
+
+def invalidate_site(site_id=None):
+    """Drop the cached nodes of every menu of a site, or of all sites
+    if no site_id is given"""
+    if site_id is None:
+        site_ids = Site.objects.values_list("pk", flat=True)
+    else:
+        site_ids = [site_id]
+    cache.set_many(
+        {_get_generation_key(pk): uuid4().hex for pk in site_ids}, None
+    )
+    if CACHE_MAX_STALENESS:
+        invalidated_at = time.time()
+        cache.set_many(
+            {_get_invalidation_key(pk): invalidated_at for pk in site_ids},
+            get_stale_cache_duration(),
+        )
@@ -1,10 +1,24 @@
+from itertools import islice
+
+import django
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.db.models import CharField, Value
+from django.db.models.functions import Concat, Substr
 
 from cms.app_base import CMSAppConfig, CMSAppExtension
 from cms.models import Page
 
+from .cache import DRAFT_STATE
+from .constants import (
+    COPY_BATCH_SIZE,
+    COPY_IN_DATABASE,
+    COPY_IN_DATABASE_VENDORS,
+)
 from .models import MenuContent, MenuItem
+from .search import PageContentSearch
+from .snapshots import create_snapshots
 from .utils import purge_menu_cache
 
 
@@ -27,8 +41,8 @@ class NavigationCMSExtension(CMSAppExtension):
             )
 
 
-def _get_model_fields(instance, model, field_exclusion_list=[]):
-    field_exclusion_list.append(model._meta.pk.name)
+def _get_model_fields(instance, model, field_exclusion_list=None):
+    field_exclusion_list = [model._meta.pk.name] + list(field_exclusion_list or [])
     return {
         field.name: getattr(instance, field.name)
         for field in model._meta.fields
@@ -36,6 +50,87 @@ def _get_model_fields(instance, model, field_exclusion_list=[]):
     }
 
 
+def _get_copied_field_names(model, field_exclusion_list):
+    """Return the column attnames copied from one instance to another,
+    foreign keys are copied by id without fetching the related object"""
+    field_exclusion_list = [model._meta.pk.name] + list(field_exclusion_list)
+    return [
+        field.attname
+        for field in model._meta.concrete_fields
+        if field.name not in field_exclusion_list
+    ]
+
+
+def _batched(iterable, size):
+    iterator = iter(iterable)
+    batch = list(islice(iterator, size))
+    while batch:
+        yield batch
+        batch = list(islice(iterator, size))
+
+
+def _copy_menu_items(original_root, new_root, field_names):
+    """Copy the descendants of ``original_root`` under ``new_root``,
+    streaming the rows of the source tree in batches so large menus are
+    never held in memory at once"""
+    rows = (
+        MenuItem.get_tree(original_root)
+        .exclude(pk=original_root.pk)
+        .values_list("path", *field_names)
+    )
+    # The chunk size of iterator() can only be set from Django 2.0
+    if django.VERSION >= (2, 0):
+        rows = rows.iterator(chunk_size=COPY_BATCH_SIZE)
+    else:
+        rows = rows.iterator()
+    for batch in _batched(rows, COPY_BATCH_SIZE):
+        MenuItem.objects.bulk_create(
+            [
+                MenuItem(
+                    path=new_root.path + path[MenuItem.steplen:],
+                    **dict(zip(field_names, values))
+                )
+                for path, *values in batch
+            ]
+        )
+
+
+def _copy_menu_items_in_database(original_root, new_root, field_names):
+    """Copy the descendants of ``original_root`` under ``new_root`` with a
+    single INSERT ... SELECT rewriting the prefix of their paths.
+
+    :return: False when the database doesn't support the copy
+    """
+    rows = (
+        MenuItem.get_tree(original_root)
+        .exclude(pk=original_root.pk)
+        .order_by()
+        .annotate(
+            copied_path=Concat(
+                Value(new_root.path),
+                Substr("path", MenuItem.steplen + 1),
+                output_field=CharField(),
+            )
+        )
+        # Annotations are selected after the fields
+        .values_list(*field_names, "copied_path")
+    )
+    connection = connections[rows.db]
+    if connection.vendor not in COPY_IN_DATABASE_VENDORS:
+        return False
+    select_sql, params = rows.query.get_compiler(connection=connection).as_sql()
+    columns = [MenuItem._meta.get_field(name).column for name in field_names]
+    columns.append(MenuItem._meta.get_field("path").column)
+    sql = "INSERT INTO {} ({}) {}".format(
+        connection.ops.quote_name(MenuItem._meta.db_table),
+        ", ".join(connection.ops.quote_name(column) for column in columns),
+        select_sql,
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+    return True
+
+
 def copy_menu_content(original_content):
     """Copy the MenuContent object and deepcopy its menu items."""
     # Copy root menu item
@@ -49,34 +144,35 @@ def copy_menu_content(original_content):
     new_content = MenuContent.objects.create(**content_fields)
 
     # Copy menu items
-    to_create = []
-    for item in MenuItem.get_tree(original_root).exclude(pk=original_root.pk):
-        item_fields = _get_model_fields(item, MenuItem, field_exclusion_list=['path'])
-        item_fields["path"] = new_root.path + item.path[MenuItem.steplen:]
-        to_create.append(MenuItem(**item_fields))
-    MenuItem.objects.bulk_create(to_create)
+    field_names = _get_copied_field_names(MenuItem, field_exclusion_list=["path"])
+    if not (COPY_IN_DATABASE and _copy_menu_items_in_database(original_root, new_root, field_names)):
+        _copy_menu_items(original_root, new_root, field_names)
 
     return new_content
 
 
 def on_menu_content_publish(version):
-    menu_content = version.content
-    purge_menu_cache(site_id=menu_content.menu.site_id)
+    menu = version.content.menu
+    purge_menu_cache(site_id=menu.site_id, menu=menu)
+    # Published menus can't change until their next version transition
+    create_snapshots(version.content)
 
 
 def on_menu_content_unpublish(version):
-    menu_content = version.content
-    purge_menu_cache(site_id=menu_content.menu.site_id)
+    menu = version.content.menu
+    purge_menu_cache(site_id=menu.site_id, menu=menu)
 
 
 def on_menu_content_draft_create(version):
-    menu_content = version.content
-    purge_menu_cache(site_id=menu_content.menu.site_id)
+    menu = version.content.menu
+    # The published menu is left as it is
+    purge_menu_cache(site_id=menu.site_id, menu=menu, state=DRAFT_STATE)
 
 
 def on_menu_content_archive(version):
-    menu_content = version.content
-    purge_menu_cache(site_id=menu_content.menu.site_id)
+    menu = version.content.menu
+    # Only drafts are archived, the published menu is left as it is
+    purge_menu_cache(site_id=menu.site_id, menu=menu, state=DRAFT_STATE)
 
 
 class NavigationCMSAppConfig(CMSAppConfig):
@@ -90,8 +186,8 @@ class NavigationCMSAppConfig(CMSAppConfig):
         settings, "DJANGOCMS_NAVIGATION_MODERATION_ENABLED", True
     )
     navigation_models = {
-        # model_class : field(s) to search in menu item form UI
-        Page: ["title"]
+        # model_class : field(s) or search backend used in menu item form UI
+        Page: PageContentSearch(["title"])
     }
 
     if djangocms_versioning_enabled:
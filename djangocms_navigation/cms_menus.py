@@ -1,24 +1,72 @@
+from collections import Counter, defaultdict
+from copy import copy
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
 from django.db.models import Q
+from django.utils import translation
 
 from cms.cms_menus import CMSMenu as OriginalCMSMenu
+from cms.models import Page, PageContent
 from cms.utils import get_current_site
+from cms.utils.i18n import get_fallback_languages
 from menus.base import Menu, Modifier, NavigationNode
-from menus.menu_pool import menu_pool
+from menus.menu_pool import MenuRenderer, menu_pool
 
 from djangocms_versioning.constants import DRAFT, PUBLISHED
 
-from .models import MenuContent, MenuItem
+from . import cache as navigation_cache, rebuild, snapshots
+from .constants import REBUILD_WAIT
+from .models import Menu as NavigationMenu, MenuContent, MenuItem
+from .nodes import MenuNode
 from .utils import get_versionable_for_content
 
 
+def get_menu_languages(language, site_id):
+    """Return the languages of the menus shown in ``language``, in order
+    of preference.
+
+    The language comes first, followed by the fallbacks set by
+    ``DJANGOCMS_NAVIGATION_LANGUAGE_FALLBACKS``: True (the default)
+    uses the fallbacks configured in ``CMS_LANGUAGES``, a dict maps a
+    language to its own list of fallbacks and False disables them.
+    """
+    fallbacks = getattr(settings, "DJANGOCMS_NAVIGATION_LANGUAGE_FALLBACKS", True)
+    if fallbacks is True:
+        fallbacks = get_fallback_languages(language, site_id=site_id)
+    elif isinstance(fallbacks, dict):
+        fallbacks = fallbacks.get(language, [])
+    else:
+        fallbacks = []
+    return [language] + [
+        fallback for fallback in fallbacks if fallback != language
+    ]
+
+
 class CMSMenu(Menu):
+    menu_model = NavigationMenu
     menu_content_model = MenuContent
     menu_item_model = MenuItem
 
-    def get_roots(self, request):
+    def get_languages(self):
+        """Return the languages of the menus to show, in order of preference"""
+        return get_menu_languages(self.renderer.request_language, get_current_site().pk)
+
+    def get_namespace(self):
+        """Return the root_id of the only menu to build, if any"""
+        return getattr(self.renderer, "navigation_namespace", None)
+
+    def get_roots(self, request, namespace=None):
         queryset = self.menu_item_model.get_root_nodes().filter(
-            menucontent__menu__site=get_current_site()
-        )
+            menucontent__menu__site=get_current_site(),
+            menucontent__language__in=self.get_languages(),
+        ).select_related("menucontent__menu")
+        if namespace:
+            queryset = queryset.filter(
+                menucontent__menu__identifier=self.menu_model.get_identifier_from_root_id(
+                    namespace
+                )
+            )
         versionable = get_versionable_for_content(self.menu_content_model)
         if versionable:
             inner_filter = {"versions__state__in": [PUBLISHED]}
@@ -28,42 +76,311 @@ class CMSMenu(Menu):
             queryset = queryset.filter(menucontent__in=menucontents)
         return queryset
 
+    def select_roots(self, roots, languages):
+        """Keep a single root per menu, the one in the most preferred
+        of the given languages, preserving the order of ``roots``"""
+        preferred = {}
+        for root in roots:
+            identifier = root.menucontent.menu.identifier
+            rank = languages.index(root.menucontent.language)
+            if identifier not in preferred or rank < preferred[identifier][0]:
+                preferred[identifier] = (rank, root)
+        selected = {root.pk for rank, root in preferred.values()}
+        return [root for root in roots if root.pk in selected]
+
+    def get_path_ranges(self, root_paths):
+        """Return (lower, upper) path bounds covering the descendants of
+        the given root paths.
+
+        Descendants of a root sort strictly between its path and the path
+        of the next possible root, so roots which are adjacent in the tree
+        share a single range. ``upper`` is None when there is no next root.
+        """
+        model = self.menu_item_model
+        max_step = len(model.alphabet) ** model.steplen
+        ranges = []
+        for path in sorted(root_paths):
+            step = model._str2int(path) + 1
+            upper = model._get_path(None, 1, step) if step < max_step else None
+            if ranges and ranges[-1][1] == path:
+                ranges[-1] = (ranges[-1][0], upper)
+            else:
+                ranges.append((path, upper))
+        return ranges
+
     def get_menu_nodes(self, roots):
-        root_paths = roots.values_list("path", flat=True)
+        root_paths = [root.path for root in roots]
         path_q = Q()
-        for path in root_paths:
-            path_q |= Q(path__startswith=path) & ~Q(path=path)
-        return self.menu_item_model.get_tree().filter(path_q).order_by("path")
+        for lower, upper in self.get_path_ranges(root_paths):
+            range_q = Q(path__gt=lower)
+            if upper:
+                range_q &= Q(path__lt=upper)
+            path_q |= range_q
+        if not path_q:
+            return self.menu_item_model.objects.none()
+        return self.menu_item_model.get_tree().filter(
+            path_q, depth__gt=1
+        ).order_by("path")
+
+    def get_content_queryset(self, model):
+        """Return the queryset used to load linked objects of ``model``"""
+        queryset = model._base_manager.all()
+        if model is Page:
+            queryset = queryset.prefetch_related("urls")
+        elif model is PageContent:
+            queryset = queryset.select_related("page").prefetch_related("page__urls")
+        return queryset
+
+    def get_content_objects(self, nodes):
+        """Load the objects linked to the nodes with one query per
+        content type instead of dereferencing ``content`` per node.
+
+        :return: dict of objects keyed by (content_type_id, object_id)
+        """
+        object_ids = defaultdict(set)
+        for node in nodes:
+            if node.content_type_id and node.object_id:
+                object_ids[node.content_type_id].add(node.object_id)
+
+        content_objects = {}
+        for content_type_id, ids in object_ids.items():
+            model = ContentType.objects.get_for_id(content_type_id).model_class()
+            queryset = self.get_content_queryset(model)
+            for pk, obj in queryset.in_bulk(ids).items():
+                content_objects[content_type_id, pk] = obj
+        return content_objects
 
     def get_navigation_nodes(self, nodes, root_ids):
+        """Yield a MenuNode for each of the (path ordered) nodes.
+
+        Parents are resolved from the materialized path of each node
+        rather than with ``get_parent()``, which would cost a query per
+        node. ``root_ids`` maps the path of every root MenuItem to the
+        id of its menu's root NavigationNode.
+        """
+        steplen = self.menu_item_model.steplen
+        ids_by_path = dict(root_ids)
+        content_objects = self.get_content_objects(nodes)
         for node in nodes:
-            parent = node.get_parent()
-            url = node.content.get_absolute_url() if node.content else ""
-            if parent.id in root_ids:
-                parent_id = root_ids[parent.id]
-            else:
-                parent_id = parent.id
-            yield NavigationNode(
-                title=node.title,
-                url=url,
-                id=node.pk,
-                parent_id=parent_id,
-                attr={"link_target": node.link_target},
+            parent_id = ids_by_path[node.path[:-steplen]]
+            ids_by_path[node.path] = node.pk
+            content = content_objects.get((node.content_type_id, node.object_id))
+            url = content.get_absolute_url() if content else ""
+            yield MenuNode(node.pk, parent_id, node.title, url, node.link_target)
+
+    def build_menus(self, roots):
+        """Build the MenuNode records of the menus of the given roots
+
+        :return: dict of MenuNode lists keyed by menu identifier
+        """
+        steplen = self.menu_item_model.steplen
+        root_ids = {}
+        menus = {}
+        identifiers = {}
+        for root in roots:
+            menu = root.menucontent.menu
+            root_ids[root.path] = menu.root_id
+            identifiers[root.path] = menu.identifier
+            menus[menu.identifier] = []
+        menu_nodes = list(self.get_menu_nodes(roots))
+        navigation_nodes = self.get_navigation_nodes(menu_nodes, root_ids)
+        for item, node in zip(menu_nodes, navigation_nodes):
+            menus[identifiers[item.path[:steplen]]].append(node)
+        return menus
+
+    def get_menus(self, roots):
+        """Return the nodes of the menus of the given roots, keyed by menu
+        identifier, from the navigation cache where possible.
+
+        Outside of draft mode, menus missing from the cache are read from
+        their snapshot, and snapshots are taken of the menus that had to
+        be built. Menus with a recent enough stale copy are served from it
+        and rebuilt in the background, the others are built by a single
+        process at a time.
+        """
+        site_id = get_current_site().pk
+        language = self.renderer.request_language
+        state = navigation_cache.get_versioning_state(
+            self.renderer.draft_mode_active
+        )
+        identifiers = [root.menucontent.menu.identifier for root in roots]
+        menus = navigation_cache.get_menus(site_id, language, state, identifiers)
+        missing_roots = [
+            root for root in roots if root.menucontent.menu.identifier not in menus
+        ]
+        if state == navigation_cache.PUBLISHED_STATE:
+            snapshot_menus = snapshots.get_menus(missing_roots, language)
+            navigation_cache.set_menus(site_id, language, state, snapshot_menus)
+            menus.update(snapshot_menus)
+            missing_roots = [
+                root for root in missing_roots
+                if root.menucontent.menu.identifier not in snapshot_menus
+            ]
+        stale_menus = navigation_cache.get_stale_menus(
+            site_id, language, state,
+            [root.menucontent.menu.identifier for root in missing_roots],
+        )
+        for root in missing_roots:
+            identifier = root.menucontent.menu.identifier
+            if identifier in stale_menus:
+                rebuild.schedule(
+                    (site_id, language, state, identifier),
+                    self.rebuild_stale_menu, root, site_id, language, state,
+                )
+        menus.update(stale_menus)
+        missing_roots = [
+            root for root in missing_roots
+            if root.menucontent.menu.identifier not in stale_menus
+        ]
+        menus.update(self.build_missing_menus(missing_roots, site_id, language, state))
+        return menus
+
+    def build_missing_menus(self, roots, site_id, language, state):
+        """Build and cache the menus of the given roots.
+
+        Each menu is built by a single process at a time. The menus which
+        are locked by another process are waited for in the cache for up
+        to REBUILD_WAIT seconds, and built anyway if they still are missing.
+
+        :return: dict of MenuNode lists keyed by menu identifier
+        """
+        if not roots:
+            return {}
+        locks = {}
+        try:
+            for root in roots:
+                key = navigation_cache.get_lock_key(
+                    site_id, language, root.menucontent.menu.identifier, state
+                )
+                token = rebuild.acquire_lock(key)
+                if token is not None:
+                    locks[root] = (key, token)
+            menus = self.build_and_cache_menus(
+                [root for root in roots if root in locks], site_id, language, state
             )
+            locked_identifiers = [
+                root.menucontent.menu.identifier for root in roots if root not in locks
+            ]
+            if locked_identifiers:
+                menus.update(navigation_cache.wait_for_menus(
+                    site_id, language, state, locked_identifiers, REBUILD_WAIT
+                ))
+                menus.update(self.build_and_cache_menus(
+                    [root for root in roots if root.menucontent.menu.identifier not in menus],
+                    site_id, language, state,
+                ))
+        finally:
+            for key, token in locks.values():
+                rebuild.release_lock(key, token)
+        return menus
+
+    def build_and_cache_menus(self, roots, site_id, language, state):
+        """Build the menus of the given roots, then cache and snapshot them
+
+        :return: dict of MenuNode lists keyed by menu identifier
+        """
+        if not roots:
+            return {}
+        with translation.override(language):
+            menus = self.build_menus(roots)
+        if state == navigation_cache.PUBLISHED_STATE:
+            snapshots.save_menus(roots, language, menus)
+        navigation_cache.set_menus(site_id, language, state, menus)
+        return menus
+
+    def rebuild_stale_menu(self, root, site_id, language, state):
+        """Rebuild the menu of a root in place of its stale copy, outside of
+        the request it was served in, unless another process already is"""
+        key = navigation_cache.get_lock_key(
+            site_id, language, root.menucontent.menu.identifier, state
+        )
+        token = rebuild.acquire_lock(key)
+        if token is None:
+            return
+        try:
+            self.build_and_cache_menus([root], site_id, language, state)
+        finally:
+            # The menu pool cached the nodes built from the stale copy for
+            # as long as it caches any nodes
+            menu_pool.clear(site_id=site_id, language=language)
+            rebuild.release_lock(key, token)
 
     def get_nodes(self, request):
-        navigations = self.get_roots(request)
-        root_navigation_nodes = []
-        root_ids = {}
-        for navigation in navigations:
-            identifier = navigation.menucontent.menu.root_id
-            node = NavigationNode(title="", url="", id=identifier)
-            root_navigation_nodes.append(node)
-            root_ids[navigation.pk] = identifier
-        menu_nodes = self.get_menu_nodes(navigations)
-        return root_navigation_nodes + list(
-            self.get_navigation_nodes(menu_nodes, root_ids)
+        roots = self.select_roots(
+            self.get_roots(request, namespace=self.get_namespace()),
+            self.get_languages(),
         )
+        menus = self.get_menus(roots)
+        root_navigation_nodes = []
+        menu_navigation_nodes = []
+        for root in roots:
+            menu = root.menucontent.menu
+            root_navigation_nodes.append(
+                NavigationNode(title="", url="", id=menu.root_id)
+            )
+            # Only the menus of the request are expanded into NavigationNodes
+            menu_navigation_nodes += [
+                node.to_navigation_node() for node in menus[menu.identifier]
+            ]
+        return root_navigation_nodes + menu_navigation_nodes
+
+
+class NavigationMenuRenderer(MenuRenderer):
+    """Menu renderer which only builds the nodes of a single navigation
+    menu, given by its root_id, rather than the nodes of every menu of
+    the site.
+
+    The nodes are cached under their own menu pool cache key, so that
+    they are purged along with the nodes of the site.
+    """
+
+    def __init__(self, pool, request, namespace):
+        super().__init__(pool, request)
+        self.navigation_namespace = namespace
+        self.menus = {
+            name: menu for name, menu in self.menus.items()
+            if issubclass(menu, CMSMenu)
+        }
+
+    @property
+    def cache_key(self):
+        return "{}:{}".format(super().cache_key, self.navigation_namespace)
+
+    def _build_nodes(self):
+        """Build or fetch the nodes once per request and menu.
+
+        A page usually renders several navigation plugins, each with its
+        own renderer. The nodes are kept on the request and every renderer
+        gets a copy of them, since modifiers change the nodes they are
+        given. ``request.navigation_node_loads`` counts the nodes built or
+        fetched from the cache per cache key.
+        """
+        request_nodes = getattr(self.request, "_navigation_nodes", None)
+        if request_nodes is None:
+            request_nodes = self.request._navigation_nodes = {}
+            self.request.navigation_node_loads = Counter()
+        key = self.cache_key
+        nodes = request_nodes.get(key)
+        if nodes is None:
+            nodes = request_nodes[key] = super()._build_nodes()
+            self.request.navigation_node_loads[key] += 1
+        return copy_nodes(nodes)
+
+
+def copy_nodes(nodes):
+    """Copy a list of linked NavigationNode objects, linking the copies
+    to each other the same way"""
+    copies = {}
+    for node in nodes:
+        node_copy = copy(node)
+        node_copy.attr = dict(node.attr)
+        copies[id(node)] = node_copy
+    for node in nodes:
+        node_copy = copies[id(node)]
+        if node.parent is not None:
+            node_copy.parent = copies[id(node.parent)]
+        node_copy.children = [copies[id(child)] for child in node.children]
+    return [copies[id(node)] for node in nodes]
 
 
 class NavigationSelector(Modifier):
@@ -78,13 +395,37 @@ class NavigationSelector(Modifier):
         if post_cut or root_id or not nodes:
             return nodes
         if namespace:
-            tree_id = namespace
+            root = self.get_root(request, nodes, namespace)
+            if root is None:
+                return []
         else:
             # defaulting to first subtree
-            tree_id = nodes[0].id
-        root = next(n for n in nodes if n.id == tree_id)
+            root = nodes[0]
         return [self.make_roots(node, root) for node in root.children]
 
+    def get_root(self, request, nodes, tree_id):
+        """Return the root node of the ``tree_id`` menu.
+
+        Every renderer of a request gets its own copy of the same node
+        list, so the positions of the root nodes are indexed once per
+        request and renderer cache key, like the nodes themselves.
+        """
+        request_positions = getattr(request, "_navigation_root_positions", None)
+        if request_positions is None:
+            request_positions = request._navigation_root_positions = {}
+        key = getattr(self.renderer, "cache_key", None)
+        positions = request_positions.get(key, {})
+        position = positions.get(tree_id)
+        if position is None or position >= len(nodes) or nodes[position].id != tree_id:
+            positions = request_positions[key] = {
+                node.id: index for index, node in enumerate(nodes)
+                if node.parent_id is None
+            }
+            position = positions.get(tree_id)
+            if position is None:
+                return None
+        return nodes[position]
+
     def make_roots(self, node, previous_root):
         """Detach level 1 nodes from parent, making them roots"""
         if node.parent == previous_root:
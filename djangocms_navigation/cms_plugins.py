@@ -2,7 +2,9 @@ from django.utils.translation import ugettext_lazy as _
 
 from cms.plugin_base import CMSPluginBase
 from cms.plugin_pool import plugin_pool
+from menus.menu_pool import menu_pool
 
+from .cms_menus import NavigationMenuRenderer
 from .forms import NavigationPluginForm
 from .models import NavigationPlugin
 
@@ -16,3 +18,11 @@ class Navigation(CMSPluginBase):
     model = NavigationPlugin
     form = NavigationPluginForm
     render_template = "djangocms_navigation/plugins/navigation.html"
+
+    def render(self, context, instance, placeholder):
+        context = super().render(context, instance, placeholder)
+        # Only build the nodes of the menu selected in the plugin
+        context["cms_menu_renderer"] = NavigationMenuRenderer(
+            menu_pool, context["request"], namespace=instance.menu.root_id
+        )
+        return context
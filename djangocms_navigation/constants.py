@@ -26,3 +26,46 @@ PLUGIN_URL_NAME_PREFIX = "djangocms_navigation"
 SELECT2_CONTENT_OBJECT_URL_NAME = "{}_select2_content_object".format(
     PLUGIN_URL_NAME_PREFIX
 )
+
+# Number of content objects returned per select2 page unless a ``limit``
+# is requested, and the largest ``limit`` that can be requested
+SELECT2_PAGE_SIZE = 30
+SELECT2_MAX_PAGE_SIZE = getattr(
+    settings, "DJANGOCMS_NAVIGATION_SELECT2_MAX_PAGE_SIZE", 100
+)
+
+# Seconds the select2 responses are cached for, 0 disables the cache
+SELECT2_CACHE_TIMEOUT = getattr(
+    settings, "DJANGOCMS_NAVIGATION_SELECT2_CACHE_TIMEOUT", 60
+)
+
+# Number of menu items inserted per query when a menu content is copied
+COPY_BATCH_SIZE = getattr(settings, "DJANGOCMS_NAVIGATION_COPY_BATCH_SIZE", 1000)
+
+# Copy the menu items of a menu content with a single INSERT ... SELECT on
+# the databases supporting it, instead of round-tripping them through Python
+COPY_IN_DATABASE = getattr(settings, "DJANGOCMS_NAVIGATION_COPY_IN_DATABASE", True)
+COPY_IN_DATABASE_VENDORS = ("postgresql", "sqlite")
+
+# Cached menus larger than this number of bytes are compressed
+CACHE_COMPRESS_THRESHOLD = getattr(
+    settings, "DJANGOCMS_NAVIGATION_CACHE_COMPRESS_THRESHOLD", 1024
+)
+
+# Seconds the stale copy of a menu keeps being served while the menu is
+# rebuilt in the background, 0 rebuilds invalidated menus during the request
+CACHE_MAX_STALENESS = getattr(
+    settings, "DJANGOCMS_NAVIGATION_CACHE_MAX_STALENESS", 0
+)
+
+# Seconds the snapshot of a published menu is read instead of building
+# the menu, None for as long as menus are cached and 0 keeps snapshots
+# until the menu or the pages of its site change
+SNAPSHOT_MAX_AGE = getattr(settings, "DJANGOCMS_NAVIGATION_SNAPSHOT_MAX_AGE", None)
+
+# Seconds a process may hold the lock of rebuilding a menu, and seconds
+# the other processes wait for the menu before building it themselves
+REBUILD_LOCK_TIMEOUT = getattr(
+    settings, "DJANGOCMS_NAVIGATION_REBUILD_LOCK_TIMEOUT", 30
+)
+REBUILD_WAIT = getattr(settings, "DJANGOCMS_NAVIGATION_REBUILD_WAIT", 2)
@@ -78,6 +78,13 @@ class MenuItemForm(MoveNodeForm):
         self.fields["_ref_node_id"].choices = self.mk_dropdown_tree(
             self._meta.model, for_node=self.menu_root.get_root()
         )
+        try:
+            # Search the content objects in the language of the menu
+            self.fields["object_id"].widget.attrs["data-language"] = (
+                self.menu_root.menucontent.language
+            )
+        except MenuContent.DoesNotExist:
+            pass
 
     def clean(self):
         cleaned_data = super().clean()
@@ -0,0 +1,130 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from cms import operations
+from cms.models import Page, PageContent
+from cms.signals import post_obj_operation
+
+from .cache import invalidate_site
+from .models import MenuContent, MenuItem
+from .snapshots import delete_snapshots
+from .utils import (
+    get_menu_content_state,
+    get_versionable_for_content,
+    purge_menu_cache,
+    supported_models,
+)
+
+
+try:
+    from djangocms_versioning.constants import OPERATION_PUBLISH, OPERATION_UNPUBLISH
+    from djangocms_versioning.signals import post_version_operation
+except ImportError:
+    post_version_operation = None
+
+
+def purge_menu_cache_of_menu_item(item):
+    menu_content = (
+        MenuContent._base_manager.select_related("menu")
+        .filter(root__path=item.path[:MenuItem.steplen])
+        .first()
+    )
+    # The root item of a new menu is saved before its MenuContent
+    if menu_content:
+        purge_menu_cache(
+            site_id=menu_content.menu.site_id,
+            menu=menu_content.menu,
+            state=get_menu_content_state(menu_content),
+        )
+
+
+@receiver(post_save, sender=MenuItem, dispatch_uid="djangocms_navigation_menuitem_save")
+def purge_menu_cache_on_menu_item_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    purge_menu_cache_of_menu_item(instance)
+
+
+@receiver(post_delete, sender=MenuItem, dispatch_uid="djangocms_navigation_menuitem_delete")
+def purge_menu_cache_on_menu_item_delete(sender, instance, **kwargs):
+    # A subtree is deleted before post_delete is sent for each of its
+    # items, the menu is only purged once, for the top item of the subtree
+    if instance.depth > 1 and not MenuItem.objects.filter(
+        path=instance.path[:-MenuItem.steplen]
+    ).exists():
+        return
+    purge_menu_cache_of_menu_item(instance)
+
+
+@receiver(post_save, sender=MenuContent, dispatch_uid="djangocms_navigation_menucontent_save")
+def purge_menu_cache_on_menu_content_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    purge_menu_cache(
+        site_id=instance.menu.site_id,
+        menu=instance.menu,
+        state=get_menu_content_state(instance),
+    )
+
+
+@receiver(post_delete, sender=MenuContent, dispatch_uid="djangocms_navigation_menucontent_delete")
+def purge_menu_cache_on_menu_content_delete(sender, instance, **kwargs):
+    # The versions of the MenuContent are deleted along with it
+    purge_menu_cache(site_id=instance.menu.site_id, menu=instance.menu)
+
+
+def is_linkable_content_model(content_model):
+    """Return whether menu items can link to ``content_model`` objects,
+    or to the groupers of ``content_model`` objects"""
+    models = supported_models(MenuContent)
+    if content_model in models:
+        return True
+    versionable = get_versionable_for_content(content_model)
+    return versionable is not None and versionable.grouper_model in models
+
+
+def get_content_site_id(content):
+    """Return the id of the site of a content object, or None when it
+    is not tied to a single site"""
+    if isinstance(content, PageContent):
+        return content.page.node.site_id
+    return getattr(content, "site_id", None)
+
+
+def purge_navigation_cache_on_content_change(sender, operation, obj=None, **kwargs):
+    """Cached and snapshotted menus hold the resolved urls of the content they link to,
+    which can change whenever that content is published or unpublished.
+    MenuContent transitions are handled by the versioning callbacks in
+    cms_config and only invalidate the affected menu.
+    """
+    if sender is MenuContent or not is_linkable_content_model(sender):
+        return
+    if operation in (OPERATION_PUBLISH, OPERATION_UNPUBLISH):
+        site_id = get_content_site_id(obj.content) if obj is not None else None
+        invalidate_site(site_id)
+        delete_snapshots(site_id=site_id)
+
+
+if post_version_operation is not None:
+    post_version_operation.connect(
+        purge_navigation_cache_on_content_change,
+        dispatch_uid="djangocms_navigation_purge_on_content_change",
+    )
+
+
+@receiver(post_obj_operation, sender=Page, dispatch_uid="djangocms_navigation_purge_on_page_operation")
+def purge_navigation_cache_on_page_operation(sender, operation, obj=None, **kwargs):
+    """Moving or deleting a page changes the urls of the page and of its
+    descendants without a version operation. django CMS clears its menu
+    cache then, the cached and snapshotted menus of the site are
+    invalidated along with it.
+    """
+    if operation not in (
+        operations.MOVE_PAGE,
+        operations.DELETE_PAGE,
+        operations.DELETE_PAGE_TRANSLATION,
+    ):
+        return
+    site_id = obj.node.site_id if obj is not None else None
+    invalidate_site(site_id)
+    delete_snapshots(site_id=site_id)
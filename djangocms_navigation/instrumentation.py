@@ -0,0 +1,36 @@
+"""Lightweight counters kept in the default cache, bucketed per hour.
+
+They are meant to be read from a shell or a monitoring probe, e.g.
+``get_count(MENU_PURGES)`` for the number of menu cache purges that
+happened in the current hour.
+"""
+from django.core.cache import cache
+from django.utils import timezone
+
+
+CACHE_PREFIX = "djangocms_navigation:counters"
+# Keep the previous buckets around long enough to be collected
+BUCKET_TIMEOUT = 60 * 60 * 48
+
+MENU_PURGES = "menu_purges"
+
+
+def _get_bucket_key(name, timestamp=None):
+    timestamp = timestamp or timezone.now()
+    return "{}:{}:{}".format(CACHE_PREFIX, name, timestamp.strftime("%Y%m%d%H"))
+
+
+def increment(name, delta=1):
+    key = _get_bucket_key(name)
+    cache.add(key, 0, BUCKET_TIMEOUT)
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        # The bucket was evicted in between
+        cache.set(key, delta, BUCKET_TIMEOUT)
+
+
+def get_count(name, timestamp=None):
+    """Return the value of a counter for the hour of ``timestamp``
+    (defaults to the current hour)"""
+    return cache.get(_get_bucket_key(name, timestamp), 0)
@@ -0,0 +1,27 @@
+# Generated by Django 2.2.13 on 2026-10-18 09:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('djangocms_navigation', '0010_auto_20200630_0402'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MenuSnapshot',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language', models.CharField(max_length=15, verbose_name='language')),
+                ('nodes', models.TextField()),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('menu_content', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='djangocms_navigation.MenuContent')),
+            ],
+            options={
+                'unique_together': {('menu_content', 'language')},
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.db import migrations
+
+
+PREFIX_INDEX = "djangocms_navigation_pagecontent_title_prefix"
+
+
+def create_indexes(apps, schema_editor):
+    """Index the page titles searched by the menu item form on PostgreSQL.
+
+    The index lives on the table of django CMS, it is only created when
+    ``DJANGOCMS_NAVIGATION_PAGE_SEARCH_INDEX`` is set. It covers the
+    language and title prefix the PageContentSearch backend filters the
+    contents of a page on.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    if not getattr(settings, "DJANGOCMS_NAVIGATION_PAGE_SEARCH_INDEX", False):
+        return
+    table = schema_editor.quote_name(apps.get_model("cms", "PageContent")._meta.db_table)
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS {} ON {} (language, UPPER(title) text_pattern_ops)".format(
+            PREFIX_INDEX, table
+        )
+    )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS {}".format(PREFIX_INDEX))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cms", "0034_remove_pagecontent_placeholders"),
+        ("djangocms_navigation", "0011_menusnapshot"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
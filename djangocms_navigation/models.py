@@ -12,7 +12,9 @@ from treebeard.mp_tree import MP_Node
 from .constants import TARGETS, TEMPLATE_DEFAULT, get_templates
 
 
-__all__ = ["Menu", "MenuContent", "MenuItem", "NavigationPlugin"]
+__all__ = ["Menu", "MenuContent", "MenuItem", "MenuSnapshot", "NavigationPlugin"]
+
+ROOT_ID_PREFIX = "root-"
 
 
 class AbstractMenu(models.Model):
@@ -34,7 +36,14 @@ class AbstractMenu(models.Model):
     def root_id(self):
         """Returns the id of the root MenuItem as it will be in the
         NavigationNode instance"""
-        return "root-" + self.identifier
+        return ROOT_ID_PREFIX + self.identifier
+
+    @staticmethod
+    def get_identifier_from_root_id(root_id):
+        """Returns the identifier of the menu with the given root_id,
+        or None if root_id is not one"""
+        if root_id and root_id.startswith(ROOT_ID_PREFIX):
+            return root_id[len(ROOT_ID_PREFIX):]
 
 
 class AbstractMenuContent(models.Model):
@@ -93,6 +102,25 @@ class MenuItem(AbstractMenuItem):
     pass
 
 
+class MenuSnapshot(models.Model):
+    """
+    Navigation nodes of a MenuContent in a given language, with the urls
+    of their content resolved, stored as JSON
+    """
+    menu_content = models.ForeignKey(
+        MenuContent, related_name="snapshots", on_delete=models.CASCADE
+    )
+    language = models.CharField(_("language"), max_length=15)
+    nodes = models.TextField()
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = (("menu_content", "language"),)
+
+    def __str__(self):
+        return "{} ({})".format(self.menu_content, self.language)
+
+
 class NavigationPlugin(CMSPlugin):
     template = models.CharField(
         verbose_name=_("Template"),
@@ -0,0 +1,44 @@
+import sys
+
+from menus.base import NavigationNode
+
+
+class MenuNode:
+    """Compact record of a menu item in a built menu.
+
+    Menus are built, cached and snapshotted as MenuNode records, which
+    have no instance ``__dict__`` nor ``attr`` dict and share their
+    link_target strings. They are only expanded into the NavigationNode
+    objects of django CMS for the menus returned to the menu pool.
+    """
+
+    __slots__ = ("id", "parent_id", "title", "url", "link_target")
+
+    def __init__(self, id, parent_id, title, url, link_target):
+        self.id = id
+        self.parent_id = parent_id
+        self.title = title
+        self.url = url
+        # Every menu item has one of a handful of targets
+        self.link_target = sys.intern(link_target) if isinstance(link_target, str) else link_target
+
+    def __reduce__(self):
+        return (MenuNode, self.as_tuple())
+
+    def __eq__(self, other):
+        return isinstance(other, MenuNode) and self.as_tuple() == other.as_tuple()
+
+    def __repr__(self):
+        return "<MenuNode: {}>".format(self.title)
+
+    def as_tuple(self):
+        return (self.id, self.parent_id, self.title, self.url, self.link_target)
+
+    def to_navigation_node(self):
+        return NavigationNode(
+            title=self.title,
+            url=self.url,
+            id=self.id,
+            parent_id=self.parent_id,
+            attr={"link_target": self.link_target},
+        )
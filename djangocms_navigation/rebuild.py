@@ -0,0 +1,106 @@
+"""Coordination of menu rebuilds.
+
+Locks make a single process rebuild a menu at a time, and requests
+keep being served the stale copy of a menu while it is rebuilt (see
+``DJANGOCMS_NAVIGATION_CACHE_MAX_STALENESS``) by a single worker thread
+per process, which rebuilds the menus one at a time.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db import connections
+
+from .constants import REBUILD_LOCK_TIMEOUT
+
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_executor = None
+_pending = set()
+_held_locks = set()
+
+
+def acquire_lock(key):
+    """Take the lock of ``key``, shared with the other processes through
+    the cache. The lock is only held by this process when the cache is
+    unavailable.
+
+    :return: the token to release the lock with, or None when the lock is
+             held by another thread or process
+    """
+    with _lock:
+        if key in _held_locks:
+            return None
+        _held_locks.add(key)
+    token = uuid4().hex
+    try:
+        acquired = cache.add(key, token, REBUILD_LOCK_TIMEOUT)
+    except Exception:
+        logger.warning("Could not lock %s in the cache, locking it in this process only", key, exc_info=True)
+        acquired = True
+    if not acquired:
+        with _lock:
+            _held_locks.discard(key)
+        return None
+    return token
+
+
+def release_lock(key, token):
+    try:
+        # A lock which timed out may have been taken by another process
+        if cache.get(key) == token:
+            cache.delete(key)
+    except Exception:
+        logger.warning("Could not unlock %s in the cache", key, exc_info=True)
+    with _lock:
+        _held_locks.discard(key)
+
+
+def get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1)
+        return _executor
+
+
+def schedule(key, function, *args):
+    """Call ``function(*args)`` in the background, unless the rebuild of
+    ``key`` is already pending in this process
+
+    :return: True when the rebuild was scheduled
+    """
+    with _lock:
+        if key in _pending:
+            return False
+        _pending.add(key)
+    try:
+        get_executor().submit(_run, key, function, *args)
+    except RuntimeError:
+        # The executor was shut down along with the interpreter
+        with _lock:
+            _pending.discard(key)
+        return False
+    return True
+
+
+def is_pending(key):
+    with _lock:
+        return key in _pending
+
+
+def _run(key, function, *args):
+    try:
+        function(*args)
+    except Exception:
+        logger.exception("Rebuilding the menu %s failed", key)
+    finally:
+        # The connections of the worker thread are not closed by the
+        # request_finished signal
+        connections.close_all()
+        with _lock:
+            _pending.discard(key)
@@ -0,0 +1,138 @@
+"""Search backends of the content object select2 view.
+
+The backend of a model is set in the ``navigation_models`` of its
+cms_config, a list of fields is searched with the default PrefixSearch::
+
+    navigation_models = {
+        Article: ["title"],
+        Poll: TrigramSearch(["question"]),
+    }
+"""
+from functools import reduce
+from operator import or_
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.db.models import Exists, OuterRef, Q, Subquery
+
+from .utils import get_versionable_for_content
+
+
+class SearchBackend:
+    """Filter a queryset of content objects on the text typed in the
+    select2 widget"""
+
+    def __init__(self, fields):
+        self.fields = list(fields)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.fields == other.fields
+
+    def __repr__(self):
+        return "{}({!r})".format(type(self).__name__, self.fields)
+
+    def get_filter(self, field, query):
+        raise NotImplementedError
+
+    def get_condition(self, query):
+        return reduce(or_, (self.get_filter(field, query) for field in self.fields))
+
+    def search(self, queryset, query, language=None):
+        """Return the objects of ``queryset`` matching ``query``, all of
+        them when there is no query.
+
+        ``language`` is the language of the menu the object is looked
+        for, backends of translated content may restrict the search to it.
+        """
+        if not query or not self.fields:
+            return queryset
+        # Fields across multi-valued relations would repeat the matching rows
+        return queryset.filter(self.get_condition(query)).distinct()
+
+    def get_label(self, obj):
+        """Return the text of a search result"""
+        return str(obj)
+
+
+class PrefixSearch(SearchBackend):
+    """Match the fields starting with the query.
+
+    Unlike a substring match, a prefix match can be served by an index
+    (on Postgres an index on ``UPPER(field) text_pattern_ops``).
+    """
+
+    def get_filter(self, field, query):
+        return Q(**{"{}__istartswith".format(field): query})
+
+
+class TrigramSearch(SearchBackend):
+    """Match the fields similar to the query with the Postgres pg_trgm
+    extension, which also finds misspelled and partial words.
+
+    Requires ``django.contrib.postgres`` in INSTALLED_APPS, and a gin
+    index with ``gin_trgm_ops`` on the fields to be fast.
+    """
+
+    def search(self, queryset, query, language=None):
+        if connections[queryset.db].vendor != "postgresql":
+            raise ImproperlyConfigured("TrigramSearch requires a PostgreSQL database")
+        return super().search(queryset, query, language)
+
+    def get_filter(self, field, query):
+        return (
+            Q(**{"{}__trigram_similar".format(field): query})
+            | Q(**{"{}__istartswith".format(field): query})
+        )
+
+
+class PageContentSearch(PrefixSearch):
+    """Match pages on the fields of their PageContent objects.
+
+    The contents are matched in an EXISTS subquery rather than a join, so
+    every page is returned once. Only the contents in the menu language
+    with a draft or published version are searched, and the title of the
+    matched content is annotated as the label of the page.
+    """
+
+    def get_contents(self, query, language):
+        from cms.models import PageContent
+
+        contents = PageContent._base_manager.filter(page=OuterRef("pk"))
+        if language:
+            contents = contents.filter(language=language)
+        if get_versionable_for_content(PageContent):
+            from djangocms_versioning.constants import DRAFT, PUBLISHED
+            from djangocms_versioning.models import Version
+
+            versions = Version.objects.filter(
+                content_type=ContentType.objects.get_for_model(PageContent),
+                object_id=OuterRef("pk"),
+                state__in=(DRAFT, PUBLISHED),
+            )
+            contents = contents.annotate(is_current=Exists(versions)).filter(is_current=True)
+        if query and self.fields:
+            contents = contents.filter(self.get_condition(query))
+        return contents
+
+    def search(self, queryset, query, language=None):
+        contents = self.get_contents(query, language)
+        queryset = queryset.annotate(
+            navigation_title=Subquery(contents.order_by("-pk").values("title")[:1])
+        )
+        if query:
+            queryset = queryset.annotate(
+                has_contents=Exists(contents)
+            ).filter(has_contents=True)
+        return queryset
+
+    def get_label(self, obj):
+        # Pages without content in the menu language fall back to their title
+        return getattr(obj, "navigation_title", None) or str(obj)
+
+
+def get_search_backend(config):
+    """Return the search backend of a ``navigation_models`` entry"""
+    if isinstance(config, SearchBackend):
+        return config
+    return PrefixSearch(config or [])
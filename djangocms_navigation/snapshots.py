@@ -0,0 +1,102 @@
+import json
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone, translation
+
+from cms.utils.i18n import get_language_list
+
+from .cache import deserialize_nodes, get_cache_duration, serialize_nodes
+from .constants import SNAPSHOT_MAX_AGE
+from .models import MenuSnapshot
+
+
+def get_expiry():
+    """Return the time snapshots created before are expired, or None
+    when snapshots do not expire"""
+    max_age = get_cache_duration() if SNAPSHOT_MAX_AGE is None else SNAPSHOT_MAX_AGE
+    if max_age:
+        return timezone.now() - timedelta(seconds=max_age)
+
+
+def get_menus(roots, language):
+    """Return the snapshotted nodes of the menus of the given roots
+
+    :return: dict of MenuNode lists keyed by menu identifier,
+             menus without a snapshot are left out
+    """
+    identifiers = {
+        root.menucontent.pk: root.menucontent.menu.identifier for root in roots
+    }
+    if not identifiers:
+        return {}
+    snapshots = MenuSnapshot.objects.filter(
+        menu_content__in=list(identifiers), language=language
+    )
+    expiry = get_expiry()
+    if expiry is not None:
+        snapshots = snapshots.filter(created__gt=expiry)
+    snapshots = snapshots.values_list("menu_content_id", "nodes")
+    return {
+        identifiers[menu_content_id]: deserialize_nodes(json.loads(nodes))
+        for menu_content_id, nodes in snapshots
+    }
+
+
+def save_menus(roots, language, menus):
+    """Store snapshots of the built menus of the given roots, with menus
+    given as a dict of MenuNode lists keyed by menu identifier"""
+    snapshots = [
+        MenuSnapshot(
+            menu_content=root.menucontent,
+            language=language,
+            nodes=json.dumps(serialize_nodes(menus[root.menucontent.menu.identifier])),
+        )
+        for root in roots
+        if root.menucontent.menu.identifier in menus
+    ]
+    if not snapshots:
+        return
+    expiry = get_expiry()
+    try:
+        with transaction.atomic():
+            if expiry is not None:
+                # Expired snapshots are replaced
+                MenuSnapshot.objects.filter(
+                    menu_content__in=[snapshot.menu_content for snapshot in snapshots],
+                    language=language,
+                    created__lte=expiry,
+                ).delete()
+            MenuSnapshot.objects.bulk_create(snapshots)
+    except IntegrityError:
+        # Another request stored the same snapshots in the meantime
+        pass
+
+
+def create_snapshots(menu_content):
+    """Snapshot the nodes of a MenuContent in the languages it is shown in:
+    its own language and the languages falling back to it"""
+    from .cms_menus import CMSMenu, get_menu_languages
+
+    menu = CMSMenu(renderer=None)
+    root = menu_content.root
+    site_id = menu_content.menu.site_id
+    languages = [
+        language for language in get_language_list(site_id)
+        if menu_content.language in get_menu_languages(language, site_id)
+    ]
+    for language in languages:
+        with translation.override(language):
+            menus = menu.build_menus([root])
+        save_menus([root], language, menus)
+
+
+def delete_snapshots(site_id=None, menu=None):
+    """Delete the snapshots of a menu, of all menus of a site or of all
+    menus if neither is given"""
+    snapshots = MenuSnapshot.objects.all()
+    if menu is not None:
+        snapshots = snapshots.filter(menu_content__menu=menu)
+    elif site_id is not None:
+        snapshots = snapshots.filter(menu_content__menu__site_id=site_id)
+    snapshots.delete()
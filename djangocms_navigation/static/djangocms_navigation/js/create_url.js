@@ -1,9 +1,49 @@
 (function($) {
     $(function() {
+        let $widgets = $(':not([id*=__prefix__])[id$="object_id"]');
+        // Requests of the labels of the objects selected when the form was
+        // opened, one request per content type and language for all the widgets
+        let initialLabels = {};
+
+        function getContentTypeId($element) {
+            return $element.closest('fieldset').find('select[id$="content_type"]').val();
+        }
+
+        function getInitialLabels(endpoint, contentTypeId, language) {
+            let key = contentTypeId + ':' + language;
+            if (!initialLabels[key]) {
+                let pks = $widgets
+                    .filter(function() {
+                        return (
+                            this.value &&
+                            getContentTypeId($(this)) === contentTypeId &&
+                            $(this).attr('data-language') === language
+                        );
+                    })
+                    .map(function() {
+                        return this.value;
+                    })
+                    .get();
+
+                initialLabels[key] = $.ajax({
+                    url: endpoint,
+                    dataType: 'json',
+                    data: {
+                        pks: pks.join(','),
+                        content_type_id: contentTypeId,
+                        language: language,
+                    }
+                });
+            }
+            return initialLabels[key];
+        }
 
         function initializeContentObjectWidget($element) {
             let endpoint = $element.attr('data-select2-url');
             let itemsPerPage = 30;
+            // pk of the last result of each loaded page, sent as the cursor
+            // of the next page
+            let cursors = {};
 
             $element.select2({
                 formatAjaxError: function (jqXHR, textStatus, errorThrown) {
@@ -16,8 +56,12 @@
                     dataType: 'json',
                     quietMillis: 250,
                     data: function(term, page) {
+                        if (page === 1) {
+                            cursors = {};
+                        }
                         return {
                             page: page,
+                            after: cursors[page - 1],
                             limit: itemsPerPage,
                             site: $(this.context)
                                 .closest('fieldset')
@@ -28,29 +72,28 @@
                                 .find('.field-content_type select')
                                 .val(),
                             query: term,
+                            language: $element.attr('data-language'),
                         };
                     },
                     results: function(data, page) {
+                        if (data.results.length) {
+                            cursors[page] = data.results[data.results.length - 1].id;
+                        }
                         return data;
                     }
                 },
                 initSelection: function(element, callback) {
                     var objectId = element.val();
-                    var contentTypeId = element.closest('fieldset').find('select[id$="content_type"]').val();
+                    var contentTypeId = getContentTypeId(element);
 
-                    $.ajax({
-                        url: endpoint,
-                        dataType: 'json',
-                        data: {
-                            pk: objectId,
-                            content_type_id: contentTypeId,
-                        }
-                    })
+                    getInitialLabels(endpoint, contentTypeId, $element.attr('data-language'))
                         .done(function(data) {
                             var text = objectId;
-                            if (data.results.length) {
-                                text = data.results[0].text;
-                            }
+                            $.each(data.results, function(i, result) {
+                                if (String(result.id) === objectId) {
+                                    text = result.text;
+                                }
+                            });
                             callback({ id: objectId, text: text });
                         })
                         .fail(function() {
@@ -59,7 +102,7 @@
                 }
             });
         }
-        $(':not([id*=__prefix__])[id$="object_id"]').each(function(i, element) {
+        $widgets.each(function(i, element) {
             initializeContentObjectWidget($(element));
         });
         django
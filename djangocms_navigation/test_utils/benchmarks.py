@@ -0,0 +1,112 @@
+import itertools
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.template.loader import get_template
+from django.test.utils import CaptureQueriesContext
+
+from ..cms_plugins import Navigation
+from ..constants import TEMPLATE_DEFAULT
+from ..models import MenuItem, NavigationPlugin
+from .factories import (
+    MenuContentWithVersionFactory,
+    PageContentWithVersionFactory,
+)
+
+
+def get_branching(items, depth):
+    """Return the smallest number of children per node for which a tree
+    of the given depth holds the given number of items"""
+    branching = 1
+    while sum(branching ** level for level in range(1, depth + 1)) < items:
+        branching += 1
+    return branching
+
+
+def create_menu_tree(menu_content, items, depth, contents):
+    """Add ``items`` descendants spread over ``depth`` levels to the root
+    of a MenuContent.
+
+    Items are inserted in bulk with computed paths, which keeps large
+    trees fast to create. Items are linked to the given content objects
+    in turn, every fifth item has no content.
+    """
+    branching = get_branching(items, depth)
+    contents = itertools.cycle(contents)
+    parents = [menu_content.root]
+    to_create = []
+    while len(to_create) < items:
+        children = []
+        for parent in parents:
+            for step in range(1, branching + 1):
+                if len(to_create) == items:
+                    break
+                content = next(contents) if len(to_create) % 5 else None
+                child = MenuItem(
+                    title="Item {}".format(len(to_create)),
+                    path=MenuItem._get_path(parent.path, parent.depth + 1, step),
+                    depth=parent.depth + 1,
+                    numchild=0,
+                    content_type=(
+                        ContentType.objects.get_for_model(content) if content else None
+                    ),
+                    object_id=content.pk if content else None,
+                )
+                parent.numchild += 1
+                children.append(child)
+                to_create.append(child)
+        parents = children
+    # Every level is generated before inserting, so numchild is final here
+    MenuItem.objects.bulk_create(to_create)
+    MenuItem.objects.filter(pk=menu_content.root.pk).update(
+        numchild=menu_content.root.numchild
+    )
+    return to_create
+
+
+def create_menus(menus, items, depth, contents=20, **version_kwargs):
+    """Create published menus of ``items`` items with ``depth`` levels,
+    linked to a pool of ``contents`` page contents
+
+    :return: list of MenuContent objects
+    """
+    page_contents = PageContentWithVersionFactory.create_batch(
+        min(contents, max(items, 1)), language="en"
+    )
+    menu_contents = []
+    for _ in range(menus):
+        menu_content = MenuContentWithVersionFactory(**version_kwargs)
+        create_menu_tree(menu_content, items, depth, page_contents)
+        menu_contents.append(menu_content)
+    return menu_contents
+
+
+def render_navigation_plugin(request, menu, template=TEMPLATE_DEFAULT):
+    """Render a navigation plugin of ``menu`` the way a placeholder does"""
+    plugin = NavigationPlugin(menu=menu, template=template)
+    context = Navigation(NavigationPlugin).render({"request": request}, plugin, None)
+    return get_template(Navigation.render_template).render(context)
+
+
+@contextmanager
+def measure():
+    """Measure the queries, wall time and peak memory of a block.
+
+    The results are set on the yielded dict once the block exits, under
+    the ``queries``, ``time`` (seconds) and ``memory`` (bytes) keys.
+    """
+    result = {}
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            yield result
+    finally:
+        result["time"] = time.perf_counter() - start
+        result["memory"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    result["queries"] = len(queries)
+    result["sql"] = [query["sql"] for query in queries.captured_queries]
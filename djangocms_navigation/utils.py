@@ -6,6 +6,8 @@ from django.urls import reverse
 
 from menus.menu_pool import menu_pool
 
+from . import cache as navigation_cache, instrumentation, snapshots
+
 
 def get_admin_name(model, name):
     name = '{}_{}_{}'.format(
@@ -67,5 +69,39 @@ def get_versionable_for_content(content):
         return
 
 
-def purge_menu_cache(site_id=None, language=None):
+def get_menu_content_state(menu_content):
+    """Return the cache state (draft or published) the nodes of a
+    MenuContent are built in, or None when they are built in both"""
+    if get_versionable_for_content(menu_content.__class__) is None:
+        return
+    from djangocms_versioning.constants import PUBLISHED
+    from djangocms_versioning.models import Version
+
+    version_state = Version.objects.filter(
+        content_type=ContentType.objects.get_for_model(menu_content),
+        object_id=menu_content.pk,
+    ).values_list("state", flat=True).first()
+    # Only published menus are shown outside of draft mode, a new
+    # MenuContent is saved before its draft version is created
+    if version_state == PUBLISHED:
+        return
+    return navigation_cache.DRAFT_STATE
+
+
+def purge_menu_cache(site_id=None, language=None, menu=None, state=None):
+    """Clear the menu pool cache of a site.
+
+    The navigation cache and snapshots are only invalidated for ``menu``
+    when given, so the other menus of the site do not need to be rebuilt.
+    A ``state`` (draft or published) further restricts the invalidation
+    of the menu to the nodes cached in that state.
+    """
+    if menu is not None:
+        navigation_cache.invalidate_menu(menu, state=state)
+    else:
+        navigation_cache.invalidate_site(site_id)
+    # Only published menus are snapshotted
+    if state != navigation_cache.DRAFT_STATE:
+        snapshots.delete_snapshots(site_id=site_id, menu=menu)
     menu_pool.clear(site_id=site_id, language=language)
+    instrumentation.increment(instrumentation.MENU_PURGES)
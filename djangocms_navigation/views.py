@@ -1,11 +1,22 @@
+import hashlib
+import json
+
 from django.apps import apps
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
 from django.http import HttpResponseBadRequest, JsonResponse
 from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag, urlencode
 from django.views.generic import TemplateView, View
 
-from cms.models import Page
-
+from djangocms_navigation.cache import CACHE_PREFIX
+from djangocms_navigation.constants import (
+    SELECT2_CACHE_TIMEOUT,
+    SELECT2_MAX_PAGE_SIZE,
+    SELECT2_PAGE_SIZE,
+)
+from djangocms_navigation.search import get_search_backend
 from djangocms_navigation.utils import is_model_supported, supported_models
 
 
@@ -29,6 +40,10 @@ class MenuContentPreviewView(TemplateView):
 
 class ContentObjectSelect2View(View):
     menu_content_model = None
+    # The request parameters the response depends on
+    cache_parameters = (
+        "content_type_id", "site", "query", "language", "pk", "pks", "page", "limit", "after",
+    )
 
     def get(self, request, *args, **kwargs):
 
@@ -48,10 +63,89 @@ class ContentObjectSelect2View(View):
         if not is_model_supported(self.menu_content_model, model):
             return HttpResponseBadRequest()
 
-        data = {
-            "results": [{"text": str(obj), "id": obj.pk} for obj in self.get_data()]
+        cache_key = self.get_cache_key()
+        cached = cache.get(cache_key) if SELECT2_CACHE_TIMEOUT else None
+        if cached is None:
+            data = self.get_results(model)
+            etag = quote_etag(
+                hashlib.md5(json.dumps(data, sort_keys=True).encode()).hexdigest()
+            )
+            if SELECT2_CACHE_TIMEOUT:
+                cache.set(cache_key, (etag, data), SELECT2_CACHE_TIMEOUT)
+        else:
+            etag, data = cached
+
+        response = get_conditional_response(request, etag=etag) or JsonResponse(data)
+        response["ETag"] = etag
+        patch_cache_control(response, private=True, max_age=SELECT2_CACHE_TIMEOUT)
+        return response
+
+    def get_cache_key(self):
+        """Return the cache key of the response to the request parameters"""
+        params = urlencode(sorted(
+            (name, self.request.GET.get(name, "")) for name in self.cache_parameters
+        ))
+        return "{}:select2:{}".format(CACHE_PREFIX, hashlib.md5(params.encode()).hexdigest())
+
+    def get_results(self, model):
+        search_backend = self.get_search_backend(model)
+        objects, more = self.paginate(self.get_data())
+        return {
+            "results": [
+                {"text": search_backend.get_label(obj), "id": obj.pk} for obj in objects
+            ],
+            "more": more,
         }
-        return JsonResponse(data)
+
+    def _get_int_param(self, name, default, minimum):
+        try:
+            value = int(self.request.GET.get(name))
+        except (TypeError, ValueError):
+            return default
+        return max(value, minimum)
+
+    def get_pks(self):
+        """Return the pks of the ``pks`` parameter, a comma separated list
+        used to look up the labels of several objects in one request"""
+        pks = []
+        for pk in self.request.GET.get("pks", "").split(","):
+            try:
+                pks.append(int(pk))
+            except ValueError:
+                continue
+        return pks
+
+    def paginate(self, queryset):
+        """Return a page of the queryset and whether more objects follow.
+
+        Pages are selected with ``page`` (1-based) and ``limit``, capped to
+        SELECT2_MAX_PAGE_SIZE, a pk lookup returns all its objects at once.
+        Deep pages are cheaper to select with the ``after`` cursor, the pk
+        of the last object of the previous page, which filters on the pk
+        instead of scanning the skipped rows.
+        """
+        pks = self.get_pks()
+        if pks:
+            # The objects of a pk lookup are returned at once, there are
+            # no more of them than the requested pks
+            limit = len(pks)
+        else:
+            limit = min(
+                self._get_int_param("limit", SELECT2_PAGE_SIZE, 1), SELECT2_MAX_PAGE_SIZE
+            )
+        after = self._get_int_param("after", None, 0)
+        queryset = queryset.order_by("pk")
+        if after is not None:
+            queryset = queryset.filter(pk__gt=after)
+        else:
+            page = self._get_int_param("page", 1, 1)
+            queryset = queryset[(page - 1) * limit:]
+        # Fetch one more object to tell whether there is a next page
+        objects = list(queryset[:limit + 1])
+        return objects[:limit], len(objects) > limit
+
+    def get_search_backend(self, model):
+        return get_search_backend(supported_models(self.menu_content_model).get(model))
 
     def get_data(self):
         content_type_id = self.request.GET.get("content_type_id", None)
@@ -82,19 +176,10 @@ class ContentObjectSelect2View(View):
         if pk:
             queryset = queryset.filter(pk=pk)
 
-        if query:
-
-            # TODO: filter by language and publish state
-            # For Page model filter query by pagecontent title
-            if model == Page:
-                queryset = queryset.filter(pagecontent_set__title__icontains=query)
-            else:
-                # Non page model should work using filter against field in queryset
-                options = {}
-                search_fields = supported_models(self.menu_content_model).get(model)
-                if search_fields:
-                    for field in search_fields:
-                        options[field] = query
-                    queryset = queryset.filter(**options)
-
-        return queryset
+        if self.request.GET.get("pks"):
+            # A lookup of invalid pks only matches no object
+            queryset = queryset.filter(pk__in=self.get_pks())
+
+        return self.get_search_backend(model).search(
+            queryset, query, language=self.request.GET.get("language")
+        )
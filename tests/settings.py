@@ -1,3 +1,6 @@
+import os
+
+
 HELPER_SETTINGS = {
     "INSTALLED_APPS": [
         "djangocms_navigation",
@@ -31,6 +34,11 @@ HELPER_SETTINGS = {
 }
 
 
+# The PostgreSQL search backends need the lookups of django.contrib.postgres
+if os.environ.get("DATABASE_URL", "").startswith("postgres"):
+    HELPER_SETTINGS["INSTALLED_APPS"].append("django.contrib.postgres")
+
+
 def run():
     from djangocms_helper import runner
     runner.cms("djangocms_navigation", extra_args=[])
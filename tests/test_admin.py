@@ -6,11 +6,14 @@ from django.contrib.contenttypes.models import ContentType
 from django.contrib.messages import get_messages
 from django.contrib.sites.models import Site
 from django.shortcuts import reverse
+from django.template import engines
+from django.template.loader import get_template, render_to_string
 from django.test import RequestFactory, TestCase
 from django.test.utils import override_settings
 
 from cms.test_utils.testcases import CMSTestCase
 
+from djangocms_versioning import versionables
 from djangocms_versioning.constants import DRAFT, PUBLISHED, UNPUBLISHED
 from djangocms_versioning.exceptions import ConditionFailed
 from djangocms_versioning.helpers import version_list_url
@@ -21,6 +24,7 @@ from djangocms_navigation.admin import (
     MenuItemAdmin,
     MenuItemChangeList,
 )
+from djangocms_navigation.cache import DRAFT_STATE
 from djangocms_navigation.models import Menu, MenuContent, MenuItem
 from djangocms_navigation.test_utils import factories
 
@@ -168,6 +172,22 @@ class MenuContentAdminViewTestCase(CMSTestCase):
             self.assertEqual(site3_query_result.count(), 1)
             self.assertEqual(site3_query_result.first(), site_3_menu_version.content)
 
+    def test_menucontent_changelist_queryset_prefetches_versions(self):
+        versions = factories.MenuVersionFactory.create_batch(3, state=PUBLISHED)
+        menu_content_admin = self.admin_site._registry[MenuContent]
+        request = RequestFactory().get("/admin/djangocms_navigation/menucontent/")
+
+        menu_contents = list(menu_content_admin.get_queryset(request))
+
+        self.assertEqual(len(menu_contents), 3)
+        with self.assertNumQueries(0):
+            for menu_content in menu_contents:
+                version = menu_content_admin.get_version(menu_content)
+                self.assertIn(version, versions)
+                menu_content_admin.get_author(menu_content)
+                menu_content_admin.get_modified_date(menu_content)
+                menu_content_admin.get_versioning_state(menu_content)
+
     @patch('djangocms_navigation.admin.using_version_lock', False)
     def test_list_display_without_version_locking(self):
         request = self.get_request("/")
@@ -379,6 +399,25 @@ class MenuItemAdminChangeViewTestCase(CMSTestCase, UsefulAssertsMixin):
         )
         self.assertRedirects(response, redirect_url)
 
+    @patch("djangocms_navigation.handlers.purge_menu_cache")
+    def test_menuitem_change_view_get_does_not_purge_menu_cache(self, mocked_purge):
+        menu_content = factories.MenuContentWithVersionFactory(
+            version__state=DRAFT, version__created_by=self.get_superuser()
+        )
+        item = factories.ChildMenuItemFactory(parent=menu_content.root)
+        change_url = reverse(
+            "admin:djangocms_navigation_menuitem_change",
+            kwargs={"menu_content_id": menu_content.pk, "object_id": item.pk},
+        )
+        mocked_purge.reset_mock()
+
+        with patch("djangocms_navigation.admin.purge_menu_cache") as mocked_admin_purge:
+            response = self.client.get(change_url)
+
+        self.assertEqual(response.status_code, 200)
+        mocked_admin_purge.assert_not_called()
+        mocked_purge.assert_not_called()
+
     def test_menuitem_change_view_throws_404_on_non_existing_menucontent_get(self):
         change_url = reverse(
             "admin:djangocms_navigation_menuitem_change",
@@ -790,6 +829,26 @@ class MenuItemAdminMoveNodeViewTestCase(CMSTestCase):
         child_of_child.refresh_from_db()
         self.assertTrue(child_of_child.is_sibling_of(child))
 
+    @patch("djangocms_navigation.admin.purge_menu_cache")
+    def test_menuitem_move_node_purges_menu_cache(self, mocked_purge):
+        menu_content = factories.MenuContentWithVersionFactory(version__created_by=self.user)
+        child = factories.ChildMenuItemFactory(parent=menu_content.root)
+        child_of_child = factories.ChildMenuItemFactory(parent=child)
+        move_url = reverse(
+            "admin:djangocms_navigation_menuitem_move_node", args=(menu_content.id,)
+        )
+        data = {
+            "node_id": child_of_child.pk,
+            "sibling_id": menu_content.root.pk,
+            "as_child": 1,
+        }
+
+        self.client.post(move_url, data=data)
+
+        mocked_purge.assert_called_once_with(
+            site_id=menu_content.menu.site_id, menu=menu_content.menu, state=DRAFT_STATE
+        )
+
     @patch("django.contrib.messages.error")
     def test_menuitem_move_node_cant_move_outside_of_root(self, mocked_messages):
         menu_content = factories.MenuContentWithVersionFactory(version__created_by=self.user)
@@ -1151,3 +1210,71 @@ class ListActionsTestCase(CMSTestCase):
             "cms-versioning-action-edit ",
             response
         )
+
+    def test_proxy_model_copies_fields_and_shares_related_objects(self):
+        version = factories.MenuVersionFactory(state=DRAFT)
+        # Cache the related content on the version
+        content = version.content
+
+        proxy = nav_admin.proxy_model(version)
+
+        self.assertIsInstance(proxy, versionables.for_content(MenuContent).version_model_proxy)
+        self.assertEqual(proxy.pk, version.pk)
+        self.assertEqual(proxy.state, DRAFT)
+        self.assertIs(proxy.content, content)
+        # The original version is left untouched
+        proxy.state = PUBLISHED
+        self.assertEqual(version.state, DRAFT)
+        self.assertNotIsInstance(version, type(proxy))
+
+    def test_proxy_model_relations_cached_on_proxy_leave_version_untouched(self):
+        version = factories.MenuVersionFactory(state=DRAFT)
+        content = version.content
+
+        proxy = nav_admin.proxy_model(version)
+        proxy.content = factories.MenuContentFactory()
+
+        self.assertIs(version.content, content)
+
+
+class RenderIconTestCase(TestCase):
+    template_name = "djangocms_navigation/admin/icons/preview.html"
+
+    def setUp(self):
+        nav_admin._icon_fragments.clear()
+
+    def test_render_icon_matches_template_rendering(self):
+        for disabled in (False, True):
+            with self.subTest(disabled=disabled):
+                expected = render_to_string(
+                    self.template_name, {"url": "/preview/?a=1&b=2", "disabled": disabled}
+                )
+
+                icon = nav_admin.render_icon(self.template_name, "/preview/?a=1&b=2", disabled=disabled)
+
+                self.assertEqual(icon, expected)
+
+    def test_render_icon_renders_template_once_per_state(self):
+        template = get_template(self.template_name)
+
+        with patch("djangocms_navigation.admin.get_template", return_value=template), \
+                patch.object(template, "render", wraps=template.render) as mocked:
+            first = nav_admin.render_icon(self.template_name, "/1/")
+            second = nav_admin.render_icon(self.template_name, "/2/")
+            nav_admin.render_icon(self.template_name, "/1/", disabled=True)
+
+        self.assertEqual(mocked.call_count, 2)
+        self.assertIn('href="/1/"', first)
+        self.assertIn('href="/2/"', second)
+
+    def test_render_icon_renders_reloaded_template(self):
+        # A template loaded again, e.g. after an edit, is rendered again
+        with patch("djangocms_navigation.admin.get_template", side_effect=[
+            engines["django"].from_string("<a href=\"{{ url }}\">old</a>"),
+            engines["django"].from_string("<a href=\"{{ url }}\">new</a>"),
+        ]):
+            first = nav_admin.render_icon(self.template_name, "/1/")
+            second = nav_admin.render_icon(self.template_name, "/1/")
+
+        self.assertEqual(first, '<a href="/1/">old</a>')
+        self.assertEqual(second, '<a href="/1/">new</a>')
@@ -0,0 +1,330 @@
+"""Benchmarks of the menu building code paths.
+
+They are skipped unless the DJANGOCMS_NAVIGATION_BENCHMARKS environment
+variable is set:
+
+* ``DJANGOCMS_NAVIGATION_BENCHMARKS=1`` compares every measurement to the
+  baselines and fails on regressions. Query counts may not grow, wall
+  time and peak memory may not exceed their baseline times
+  DJANGOCMS_NAVIGATION_BENCHMARKS_TOLERANCE (defaults to 1.5).
+* ``DJANGOCMS_NAVIGATION_BENCHMARKS=record`` writes the measurements to
+  the baselines instead.
+
+Query counts do not depend on the machine, their baselines are kept in
+``benchmarks.json`` and committed along with the change that made them
+move. Wall time and peak memory baselines are kept in the untracked
+``benchmarks.local.json``, and only compared once recorded. Benchmarks
+without a recorded baseline are skipped.
+
+Baselines are kept per database vendor, so the suite can be run against
+SQLite (the default) as well as Postgres (``DATABASE_URL=postgres://...``).
+"""
+import json
+import os
+import pickle
+from copy import deepcopy
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.contrib import admin
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import RequestFactory, TestCase
+
+from cms.models import Page
+from menus.menu_pool import _build_nodes_inner_for_one_menu, menu_pool
+
+from djangocms_versioning.constants import PUBLISHED
+
+from djangocms_navigation import cache as navigation_cache
+from djangocms_navigation.admin import proxy_model
+from djangocms_navigation.cms_config import copy_menu_content
+from djangocms_navigation.cms_menus import CMSMenu, NavigationSelector
+from djangocms_navigation.constants import COPY_IN_DATABASE_VENDORS
+from djangocms_navigation.models import MenuContent, MenuSnapshot
+from djangocms_navigation.nodes import MenuNode
+from djangocms_navigation.test_utils import factories
+from djangocms_navigation.test_utils.benchmarks import (
+    create_menus,
+    measure,
+    render_navigation_plugin,
+)
+from djangocms_navigation.views import ContentObjectSelect2View
+
+
+BENCHMARKS = os.environ.get("DJANGOCMS_NAVIGATION_BENCHMARKS")
+RECORD = BENCHMARKS == "record"
+TOLERANCE = float(os.environ.get("DJANGOCMS_NAVIGATION_BENCHMARKS_TOLERANCE", 1.5))
+BASELINES_PATH = os.path.join(os.path.dirname(__file__), "benchmarks.json")
+LOCAL_BASELINES_PATH = os.path.join(os.path.dirname(__file__), "benchmarks.local.json")
+
+# name: (number of menus, items per menu, depth)
+SCENARIOS = {
+    "small": (1, 10, 2),
+    "medium": (10, 100, 3),
+    "large": (25, 400, 4),
+}
+# Scenarios of the operations whose cost grows with the size of one menu
+HUGE_SCENARIOS = {
+    "huge": (1, 50000, 5),
+}
+# name: number of nodes of the menus loaded from the cache
+CACHED_MENU_SIZES = {
+    "100": 100,
+    "1k": 1000,
+    "10k": 10000,
+}
+
+
+def load_baselines(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_baselines(path, results):
+    baselines = load_baselines(path)
+    baselines.setdefault(connection.vendor, {}).update(results)
+    with open(path, "w") as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+@skipUnless(BENCHMARKS, "Set DJANGOCMS_NAVIGATION_BENCHMARKS to run the benchmarks")
+class MenuBenchmarkTestCase(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.results = {}
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        if RECORD and cls.results:
+            save_baselines(BASELINES_PATH, {
+                name: {"queries": result["queries"]} for name, result in cls.results.items()
+            })
+            save_baselines(LOCAL_BASELINES_PATH, {
+                name: {"time": result["time"], "memory": result["memory"]}
+                for name, result in cls.results.items()
+            })
+
+    def setUp(self):
+        self.request = RequestFactory().get("/")
+        self.request.user = factories.UserFactory()
+        self.baselines = load_baselines(BASELINES_PATH).get(connection.vendor, {})
+        self.local_baselines = load_baselines(LOCAL_BASELINES_PATH).get(connection.vendor, {})
+
+    def assertWithinBaseline(self, name, result):
+        """Record the result, or compare it to its baseline"""
+        if RECORD:
+            self.results[name] = {key: result[key] for key in ("queries", "time", "memory")}
+            return
+        baseline = self.baselines.get(name)
+        if baseline is None:
+            self.skipTest(
+                "No baseline recorded for {}, run with DJANGOCMS_NAVIGATION_BENCHMARKS=record".format(name)
+            )
+        self.assertLessEqual(
+            result["queries"], baseline["queries"],
+            "{} ran more queries than its baseline:\n{}".format(name, "\n".join(result["sql"])),
+        )
+        local_baseline = self.local_baselines.get(name, {})
+        for key in ("time", "memory"):
+            if key in local_baseline:
+                self.assertLessEqual(
+                    result[key], local_baseline[key] * TOLERANCE,
+                    "{} {} regressed: {} > {} * {}".format(
+                        name, key, result[key], local_baseline[key], TOLERANCE
+                    ),
+                )
+
+    def run_scenarios(self, operation, benchmark, setup=None, scenarios=SCENARIOS):
+        """Call ``benchmark(data)`` against the data of every scenario.
+
+        ``data`` is returned by ``setup(menus, items, depth)``, by default the
+        MenuContent objects of published menus. The data of a scenario is
+        rolled back once it has been measured. ``benchmark`` returns the
+        dict yielded by ``measure``.
+        """
+        if setup is None:
+            def setup(menus, items, depth):
+                return create_menus(menus, items, depth, version__state=PUBLISHED)
+
+        results = {}
+        for scenario, (menus, items, depth) in scenarios.items():
+            with self.subTest(operation=operation, scenario=scenario), transaction.atomic():
+                data = setup(menus, items, depth)
+                cache.clear()
+                results[scenario] = benchmark(data)
+                self.assertWithinBaseline("{}:{}".format(operation, scenario), results[scenario])
+                transaction.set_rollback(True)
+        return results
+
+    def _get_nodes(self):
+        return CMSMenu(menu_pool.get_renderer(self.request)).get_nodes(self.request)
+
+    def test_get_nodes(self):
+        def benchmark(menu_contents):
+            MenuSnapshot.objects.all().delete()
+            with measure() as result:
+                self._get_nodes()
+            return result
+
+        results = self.run_scenarios("get_nodes", benchmark)
+
+        # The number of queries must not depend on the size of the menus
+        self.assertEqual(len({result["queries"] for result in results.values()}), 1)
+
+    def test_get_nodes_from_snapshots(self):
+        def benchmark(menu_contents):
+            # Store the snapshots, then only drop the cache
+            self._get_nodes()
+            cache.clear()
+            with measure() as result:
+                self._get_nodes()
+            return result
+
+        results = self.run_scenarios("get_nodes_from_snapshots", benchmark)
+
+        self.assertEqual(len({result["queries"] for result in results.values()}), 1)
+
+    def test_get_nodes_from_cache(self):
+        def benchmark(menu_contents):
+            self._get_nodes()
+            with measure() as result:
+                self._get_nodes()
+            return result
+
+        results = self.run_scenarios("get_nodes_from_cache", benchmark)
+
+        self.assertEqual(len({result["queries"] for result in results.values()}), 1)
+
+    def test_navigation_selector(self):
+        def benchmark(menu_contents):
+            renderer = menu_pool.get_renderer(self.request)
+            nodes = _build_nodes_inner_for_one_menu(self._get_nodes(), CMSMenu.__name__)
+            # One selection per menu, like one navigation plugin per menu on a page
+            with measure() as result:
+                for menu_content in menu_contents:
+                    NavigationSelector(renderer).modify(
+                        self.request, nodes, menu_content.menu.root_id, None, False, False
+                    )
+            return result
+
+        results = self.run_scenarios("navigation_selector", benchmark)
+
+        self.assertEqual({result["queries"] for result in results.values()}, {0})
+
+    def test_plugin_render(self):
+        def benchmark(menu_contents):
+            with measure() as result:
+                for menu_content in menu_contents:
+                    render_navigation_plugin(self.request, menu_content.menu)
+            return result
+
+        self.run_scenarios("plugin_render", benchmark)
+
+    def test_menucontent_changelist_actions(self):
+        modeladmin = admin.site._registry[MenuContent]
+
+        def benchmark(menu_contents):
+            rows = list(modeladmin.get_queryset(self.request))
+            list_actions = modeladmin._list_actions(self.request)
+            with measure() as result:
+                for row in rows:
+                    list_actions(row)
+
+            # The allocations of the version proxies of the rows, compared
+            # with the deep copies they replaced
+            versions = [modeladmin.get_version(row) for row in rows]
+            with measure() as proxies:
+                [proxy_model(version) for version in versions]
+            with measure() as deep_copies:
+                [deepcopy(version) for version in versions]
+            self.assertLess(proxies["memory"], deep_copies["memory"])
+            return result
+
+        self.run_scenarios("menucontent_changelist_actions", benchmark)
+
+    def test_select2_page_search(self):
+        view = ContentObjectSelect2View.as_view(menu_content_model=MenuContent)
+        content_type_id = ContentType.objects.get_for_model(Page).pk
+
+        def setup(menus, items, depth):
+            # One page per menu item, half of them matching the query
+            for i in range(items):
+                factories.PageContentWithVersionFactory(
+                    title="{} {}".format("Match" if i % 2 else "Other", i), language="en"
+                )
+
+        def benchmark(data):
+            request = RequestFactory().get(
+                "/", {"content_type_id": content_type_id, "query": "mat"}
+            )
+            request.user = self.request.user
+            with measure() as result:
+                view(request)
+            return result
+
+        self.run_scenarios("select2_page_search", benchmark, setup=setup)
+
+    def test_copy_menu_content(self):
+        def benchmark(menu_contents):
+            with measure() as result:
+                copy_menu_content(menu_contents[0])
+            return result
+
+        self.run_scenarios("copy_menu_content", benchmark)
+
+    def test_copy_huge_menu_content(self):
+        """Compare the copy through Python with the INSERT ... SELECT copy"""
+        def benchmark(menu_contents):
+            with measure() as result:
+                copy_menu_content(menu_contents[0])
+            return result
+
+        with patch("djangocms_navigation.cms_config.COPY_IN_DATABASE", False):
+            python = self.run_scenarios("copy_menu_content_python", benchmark, scenarios=HUGE_SCENARIOS)
+        if connection.vendor in COPY_IN_DATABASE_VENDORS:
+            in_database = self.run_scenarios(
+                "copy_menu_content_in_database", benchmark, scenarios=HUGE_SCENARIOS
+            )
+            # The items are copied in a single query rather than in batches
+            self.assertLess(in_database["huge"]["queries"], python["huge"]["queries"])
+
+    def test_load_cached_menu(self):
+        """Compare loading packed menus with loading pickled node tuples"""
+        formats = {
+            "pickle": (
+                navigation_cache.serialize_nodes,
+                navigation_cache.deserialize_nodes,
+            ),
+            "packed": (navigation_cache.pack_nodes, navigation_cache.unpack_nodes),
+        }
+        for size_name, size in CACHED_MENU_SIZES.items():
+            nodes = [
+                MenuNode(
+                    index + 1,
+                    index // 5 if index >= 5 else "root-benchmark",
+                    "Item {}".format(index),
+                    "/en/page-{}/".format(index),
+                    "_blank" if index % 10 else "_self",
+                )
+                for index in range(size)
+            ]
+            sizes = {}
+            for format_name, (dump, load) in formats.items():
+                with self.subTest(format=format_name, size=size_name):
+                    # What the cache backend stores and reads
+                    data = pickle.dumps(dump(nodes), pickle.HIGHEST_PROTOCOL)
+                    sizes[format_name] = len(data)
+                    with measure() as result:
+                        load(pickle.loads(data))
+                    self.assertWithinBaseline(
+                        "load_cached_menu_{}:{}".format(format_name, size_name), result
+                    )
+            self.assertLess(sizes["packed"], sizes["pickle"])
@@ -0,0 +1,206 @@
+import time
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+
+from djangocms_navigation import cache as navigation_cache
+from djangocms_navigation.nodes import MenuNode
+from djangocms_navigation.test_utils import factories
+
+
+class NavigationCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        # The test settings only have the default site
+        self.site_id = 1
+        self.nodes = [
+            MenuNode(1, "root-food", "Fruit", "/fruit/", "_self"),
+            MenuNode(2, 1, "Apples", "/fruit/apples/", "_blank"),
+        ]
+
+    def _cache_menus(self, *identifiers, language="en", state=navigation_cache.PUBLISHED_STATE):
+        navigation_cache.set_menus(
+            self.site_id, language, state,
+            {identifier: self.nodes for identifier in identifiers},
+        )
+
+    def _get_menus(self, *identifiers, language="en", state=navigation_cache.PUBLISHED_STATE):
+        return navigation_cache.get_menus(self.site_id, language, state, identifiers)
+
+    def test_set_and_get_menus(self):
+        self._cache_menus("food")
+
+        menus = self._get_menus("food", "drinks")
+
+        self.assertListEqual(list(menus), ["food"])
+        self.assertListEqual(menus["food"], self.nodes)
+
+    def test_menus_are_cached_per_language_and_state(self):
+        self._cache_menus("food", language="de")
+        self._cache_menus("food", state=navigation_cache.DRAFT_STATE)
+
+        self.assertEqual(self._get_menus("food"), {})
+        self.assertIn("food", self._get_menus("food", language="de"))
+        self.assertIn(
+            "food", self._get_menus("food", state=navigation_cache.DRAFT_STATE)
+        )
+
+    def test_invalidate_menu_keeps_other_menus(self):
+        food = factories.MenuFactory(identifier="food")
+        self._cache_menus("food", "drinks")
+        self._cache_menus("food", "drinks", state=navigation_cache.DRAFT_STATE)
+
+        navigation_cache.invalidate_menu(food)
+
+        self.assertListEqual(list(self._get_menus("food", "drinks")), ["drinks"])
+        self.assertListEqual(
+            list(self._get_menus(
+                "food", "drinks", state=navigation_cache.DRAFT_STATE
+            )),
+            ["drinks"],
+        )
+
+    def test_invalidate_menu_in_draft_state_keeps_published_menu(self):
+        food = factories.MenuFactory(identifier="food")
+        self._cache_menus("food")
+        self._cache_menus("food", state=navigation_cache.DRAFT_STATE)
+
+        navigation_cache.invalidate_menu(food, state=navigation_cache.DRAFT_STATE)
+
+        self.assertIn("food", self._get_menus("food"))
+        self.assertEqual(self._get_menus("food", state=navigation_cache.DRAFT_STATE), {})
+
+    def test_invalidate_site(self):
+        self._cache_menus("food", "drinks")
+
+        navigation_cache.invalidate_site(self.site_id)
+
+        self.assertEqual(self._get_menus("food", "drinks"), {})
+
+    def test_menu_content_publish_only_invalidates_its_menu(self):
+        user = factories.UserFactory()
+        version = factories.MenuVersionFactory(content__menu__identifier="food")
+        self._cache_menus("food", "drinks")
+
+        version.publish(user)
+
+        self.assertListEqual(list(self._get_menus("food", "drinks")), ["drinks"])
+
+    def test_menu_content_archive_only_invalidates_its_draft_menu(self):
+        user = factories.UserFactory()
+        version = factories.MenuVersionFactory(content__menu__identifier="food")
+        self._cache_menus("food")
+        self._cache_menus("food", state=navigation_cache.DRAFT_STATE)
+
+        version.archive(user)
+
+        self.assertIn("food", self._get_menus("food"))
+        self.assertEqual(self._get_menus("food", state=navigation_cache.DRAFT_STATE), {})
+
+    @patch.object(navigation_cache, "CACHE_MAX_STALENESS", 60)
+    def test_invalidated_menu_is_served_stale_for_max_staleness(self):
+        food = factories.MenuFactory(identifier="food")
+        self._cache_menus("food", "drinks")
+
+        navigation_cache.invalidate_menu(food)
+        invalidated_at = time.time()
+
+        self.assertEqual(self._get_menus("food"), {})
+        stale_menus = navigation_cache.get_stale_menus(
+            self.site_id, "en", navigation_cache.PUBLISHED_STATE, ["food", "sweets"]
+        )
+        self.assertDictEqual(stale_menus, {"food": self.nodes})
+        with patch.object(navigation_cache.time, "time", return_value=invalidated_at + 61):
+            stale_menus = navigation_cache.get_stale_menus(
+                self.site_id, "en", navigation_cache.PUBLISHED_STATE, ["food"]
+            )
+        self.assertEqual(stale_menus, {})
+
+    @patch.object(navigation_cache, "CACHE_MAX_STALENESS", 60)
+    def test_menus_of_invalidated_site_are_served_stale(self):
+        self._cache_menus("food")
+
+        navigation_cache.invalidate_site(self.site_id)
+
+        self.assertEqual(self._get_menus("food"), {})
+        self.assertIn(
+            "food",
+            navigation_cache.get_stale_menus(
+                self.site_id, "en", navigation_cache.PUBLISHED_STATE, ["food"]
+            ),
+        )
+
+    def test_no_stale_menus_by_default(self):
+        food = factories.MenuFactory(identifier="food")
+        self._cache_menus("food")
+
+        navigation_cache.invalidate_menu(food)
+
+        self.assertEqual(
+            navigation_cache.get_stale_menus(
+                self.site_id, "en", navigation_cache.PUBLISHED_STATE, ["food"]
+            ),
+            {},
+        )
+
+
+class PackNodesTestCase(SimpleTestCase):
+    def _nodes(self, count):
+        return [
+            MenuNode(
+                index + 1,
+                index // 2 if index > 1 else "root-food",
+                "Früit {}".format(index),
+                "/fruit/{}/".format(index),
+                ["_self", "_blank", "", None][index % 4],
+            )
+            for index in range(count)
+        ]
+
+    def test_round_trip(self):
+        for count in (0, 1, 10):
+            with self.subTest(count=count):
+                nodes = self._nodes(count)
+
+                self.assertListEqual(
+                    navigation_cache.unpack_nodes(navigation_cache.pack_nodes(nodes)), nodes
+                )
+
+    def test_parents_outside_of_the_menu(self):
+        nodes = [
+            MenuNode(1, "root-food", "Fruit", "/fruit/", "_self"),
+            MenuNode(2, "root-drinks", "Water", "/water/", "_self"),
+            MenuNode(3, 1, "Apples", "/fruit/apples/", "_self"),
+        ]
+
+        self.assertListEqual(
+            navigation_cache.unpack_nodes(navigation_cache.pack_nodes(nodes)), nodes
+        )
+
+    def test_large_menus_are_compressed(self):
+        nodes = self._nodes(100)
+
+        with patch.object(navigation_cache, "CACHE_COMPRESS_THRESHOLD", 10 ** 6):
+            uncompressed = navigation_cache.pack_nodes(nodes)
+        compressed = navigation_cache.pack_nodes(nodes)
+
+        self.assertLess(len(compressed), len(uncompressed))
+        self.assertListEqual(navigation_cache.unpack_nodes(compressed), nodes)
+
+    def test_other_formats_are_not_unpacked(self):
+        data = navigation_cache.pack_nodes(self._nodes(1))
+
+        self.assertIsNone(navigation_cache.unpack_nodes(b"\x00" + data[1:]))
+        self.assertIsNone(navigation_cache.unpack_nodes([(1, "root-food", "Fruit", "/fruit/", "_self")]))
+
+    def test_get_menus_ignores_entries_in_other_formats(self):
+        cache.clear()
+        key = navigation_cache.get_cache_key(
+            1, "en", "food", navigation_cache.PUBLISHED_STATE, navigation_cache.get_generation(1)
+        )
+        cache.set(key, [(1, "root-food", "Fruit", "/fruit/", "_self")])
+
+        menus = navigation_cache.get_menus(1, "en", navigation_cache.PUBLISHED_STATE, ["food"])
+
+        self.assertEqual(menus, {})
@@ -11,6 +11,7 @@ from cms.utils.setup import configure_cms_apps
 
 from djangocms_navigation import cms_config
 from djangocms_navigation.models import MenuContent
+from djangocms_navigation.search import PageContentSearch
 from djangocms_navigation.test_utils.app_1.models import TestModel1, TestModel2
 from djangocms_navigation.test_utils.app_2.models import TestModel3, TestModel4
 from djangocms_navigation.test_utils.polls.models import PollContent
@@ -75,7 +76,7 @@ class NavigationIntegrationTestCase(TestCase):
             TestModel2: [],
             TestModel3: [],
             TestModel4: [],
-            Page: ["title"],
+            Page: PageContentSearch(["title"]),
             PollContent: ["text"],
         }
         self.assertDictEqual(registered_models, expected_models)
@@ -1,8 +1,18 @@
+from types import SimpleNamespace
+from unittest import skipIf, skipUnless
+from unittest.mock import patch
+
+import django
+from django.core.cache import cache
+from django.db import connection
 from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
 
 from menus.menu_pool import menu_pool
 
-from djangocms_navigation.cms_menus import CMSMenu
+from djangocms_navigation import cache as navigation_cache, rebuild
+from djangocms_navigation.cms_menus import CMSMenu, NavigationMenuRenderer
+from djangocms_navigation.nodes import MenuNode
 from djangocms_navigation.test_utils import factories
 
 from .utils import disable_versioning_for_navigation
@@ -190,3 +200,331 @@ class CMSMenuTestCase(TestCase):
         self.assertListEqual(
             list(roots), [menucontent_1.root, menucontent_2.root, menucontent_3.root]
         )
+
+    @disable_versioning_for_navigation()
+    def test_get_navigation_nodes_resolves_parents_without_queries(self):
+        menu_content = factories.MenuContentFactory()
+        no_content = {"content": None, "content_type": None, "object_id": None}
+        child = factories.ChildMenuItemFactory(
+            parent=menu_content.root, **no_content
+        )
+        grandchild = factories.ChildMenuItemFactory(parent=child, **no_content)
+        sibling = factories.ChildMenuItemFactory(
+            parent=menu_content.root, **no_content
+        )
+        roots = self.menu.get_roots(self.request)
+        menu_nodes = list(self.menu.get_menu_nodes(roots))
+        root_ids = {menu_content.root.path: menu_content.menu.root_id}
+
+        with self.assertNumQueries(0):
+            nodes = list(self.menu.get_navigation_nodes(menu_nodes, root_ids))
+
+        self.assertEqual(
+            [(node.id, node.parent_id) for node in nodes],
+            [
+                (child.id, menu_content.menu.root_id),
+                (grandchild.id, child.id),
+                (sibling.id, menu_content.menu.root_id),
+            ],
+        )
+
+    @disable_versioning_for_navigation()
+    def test_get_navigation_nodes_loads_content_in_bulk(self):
+        """Loading linked content costs the same number of queries
+        whatever the number of linked menu items"""
+        menu_content = factories.MenuContentFactory()
+        root_ids = {menu_content.root.path: menu_content.menu.root_id}
+        children = [factories.ChildMenuItemFactory(parent=menu_content.root)]
+        roots = self.menu.get_roots(self.request)
+
+        with CaptureQueriesContext(connection) as single:
+            list(self.menu.get_navigation_nodes(
+                list(self.menu.get_menu_nodes(roots)), root_ids
+            ))
+        children += factories.ChildMenuItemFactory.create_batch(
+            4, parent=menu_content.root
+        )
+        with CaptureQueriesContext(connection) as many:
+            nodes = list(self.menu.get_navigation_nodes(
+                list(self.menu.get_menu_nodes(roots)), root_ids
+            ))
+
+        self.assertEqual(len(single), len(many))
+        self.assertEqual(
+            [node.url for node in nodes],
+            [child.content.get_absolute_url() for child in children],
+        )
+
+    def test_get_path_ranges_merges_adjacent_roots(self):
+        ranges = self.menu.get_path_ranges(["0005", "0001", "0002", "ZZZZ"])
+
+        self.assertListEqual(
+            ranges, [("0001", "0003"), ("0005", "0006"), ("ZZZZ", None)]
+        )
+
+    @disable_versioning_for_navigation()
+    def test_get_menu_nodes_excludes_roots_and_other_menus(self):
+        menu_contents = factories.MenuContentFactory.create_batch(3)
+        child1 = factories.ChildMenuItemFactory(parent=menu_contents[0].root)
+        grandchild = factories.ChildMenuItemFactory(parent=child1)
+        factories.ChildMenuItemFactory(parent=menu_contents[1].root)
+        child3 = factories.ChildMenuItemFactory(parent=menu_contents[2].root)
+        roots = self.menu.menu_item_model.get_root_nodes().filter(
+            pk__in=[menu_contents[0].root.pk, menu_contents[2].root.pk]
+        )
+
+        nodes = self.menu.get_menu_nodes(roots)
+
+        self.assertListEqual(list(nodes), [child1, grandchild, child3])
+
+    def test_get_menu_nodes_without_roots(self):
+        factories.ChildMenuItemFactory()
+        roots = self.menu.menu_item_model.get_root_nodes().none()
+
+        self.assertFalse(self.menu.get_menu_nodes(roots).exists())
+
+    @skipUnless(
+        connection.vendor in ("sqlite", "postgresql"),
+        "Query plan assertions are specific to SQLite and Postgres",
+    )
+    @skipIf(django.VERSION < (2, 1), "QuerySet.explain() requires Django 2.1")
+    @disable_versioning_for_navigation()
+    def test_get_menu_nodes_uses_path_index(self):
+        menu_contents = factories.MenuContentFactory.create_batch(2)
+        for menu_content in menu_contents:
+            factories.ChildMenuItemFactory(parent=menu_content.root)
+        nodes = self.menu.get_menu_nodes(self.menu.get_roots(self.request))
+
+        if connection.vendor == "postgresql":
+            # Tiny test tables are always cheaper to scan sequentially
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = nodes.explain()
+
+        # A range search on the path index, not a scan of the whole index
+        if connection.vendor == "postgresql":
+            self.assertRegex(plan, r"Index Cond: .*\bpath\b.* > .*\bpath\b.* < ")
+        else:
+            self.assertRegex(plan, r"SEARCH .*USING (COVERING )?INDEX \S+ \(path>\? AND path<\?\)")
+
+    @disable_versioning_for_navigation()
+    def test_get_nodes_reuses_cached_menus(self):
+        cache.clear()
+        menu_contents = factories.MenuContentFactory.create_batch(2)
+        child = factories.ChildMenuItemFactory(parent=menu_contents[0].root)
+        factories.ChildMenuItemFactory(parent=child)
+        factories.ChildMenuItemFactory(parent=menu_contents[1].root)
+        nodes = self.menu.get_nodes(self.request)
+
+        # Only the roots are queried once the menus are cached
+        with self.assertNumQueries(1):
+            cached_nodes = self.menu.get_nodes(self.request)
+
+        self.assertListEqual(
+            [(node.id, node.parent_id, node.title, node.url) for node in cached_nodes],
+            [(node.id, node.parent_id, node.title, node.url) for node in nodes],
+        )
+
+    @disable_versioning_for_navigation()
+    def test_get_nodes_only_rebuilds_invalidated_menu(self):
+        cache.clear()
+        menu_contents = factories.MenuContentFactory.create_batch(2)
+        factories.ChildMenuItemFactory(parent=menu_contents[0].root)
+        factories.ChildMenuItemFactory(parent=menu_contents[1].root)
+        self.menu.get_nodes(self.request)
+        added = factories.ChildMenuItemFactory(parent=menu_contents[1].root)
+
+        navigation_cache.invalidate_menu(menu_contents[1].menu)
+        with patch.object(self.menu, "build_menus", wraps=self.menu.build_menus) as build_menus:
+            nodes = self.menu.get_nodes(self.request)
+
+        build_menus.assert_called_once_with([menu_contents[1].root])
+        self.assertIn(added.pk, [node.id for node in nodes])
+
+    @patch("djangocms_navigation.cache.CACHE_MAX_STALENESS", 60)
+    @disable_versioning_for_navigation()
+    def test_get_nodes_serves_stale_menu_while_rebuilding_it(self):
+        cache.clear()
+        self.addCleanup(rebuild._pending.clear)
+        menu_content = factories.MenuContentFactory()
+        factories.ChildMenuItemFactory(parent=menu_content.root)
+        stale_ids = [node.id for node in self.menu.get_nodes(self.request)]
+        # Invalidates the menu
+        added = factories.ChildMenuItemFactory(parent=menu_content.root)
+        rebuilds = []
+        executor = SimpleNamespace(submit=lambda *args: rebuilds.append(args))
+
+        with patch.object(rebuild, "get_executor", return_value=executor), \
+                patch.object(self.menu, "build_menus", wraps=self.menu.build_menus) as build_menus:
+            # Requests coming in until the menu is rebuilt
+            for _ in range(3):
+                nodes = self.menu.get_nodes(self.request)
+                self.assertListEqual([node.id for node in nodes], stale_ids)
+
+        build_menus.assert_not_called()
+        self.assertEqual(len(rebuilds), 1)
+        with patch.object(rebuild, "connections"):
+            function, *args = rebuilds[0]
+            function(*args)
+        with self.assertNumQueries(1):
+            nodes = self.menu.get_nodes(self.request)
+        self.assertIn(added.pk, [node.id for node in nodes])
+
+    @patch("djangocms_navigation.cache.CACHE_MAX_STALENESS", 60)
+    @disable_versioning_for_navigation()
+    def test_menu_pool_serves_rebuilt_menu_once_stale_menu_is_rebuilt(self):
+        cache.clear()
+        self.addCleanup(rebuild._pending.clear)
+        menu_content = factories.MenuContentFactory()
+        child = factories.ChildMenuItemFactory(parent=menu_content.root)
+
+        def get_node_ids():
+            # Each request gets its own renderer, like a navigation plugin
+            request = RequestFactory().get("/")
+            request.user = self.user
+            renderer = NavigationMenuRenderer(
+                menu_pool, request, namespace=menu_content.menu.root_id
+            )
+            return [node.id for node in renderer.get_nodes(namespace=menu_content.menu.root_id)]
+
+        self.assertListEqual(get_node_ids(), [child.pk])
+        # Invalidates the menu and clears the menu pool
+        added = factories.ChildMenuItemFactory(parent=menu_content.root)
+        rebuilds = []
+        executor = SimpleNamespace(submit=lambda *args: rebuilds.append(args))
+        with patch.object(rebuild, "get_executor", return_value=executor):
+            # The menu pool caches the nodes built from the stale copy
+            self.assertListEqual(get_node_ids(), [child.pk])
+            self.assertListEqual(get_node_ids(), [child.pk])
+
+        with patch.object(rebuild, "connections"):
+            function, *args = rebuilds[0]
+            function(*args)
+
+        self.assertListEqual(get_node_ids(), [child.pk, added.pk])
+
+    def _lock_menu(self, menu_content):
+        """Lock the menu as if another process was building it"""
+        key = navigation_cache.get_lock_key(
+            1, "en", menu_content.menu.identifier, navigation_cache.PUBLISHED_STATE
+        )
+        cache.add(key, "another process")
+        self.addCleanup(cache.delete, key)
+
+    @disable_versioning_for_navigation()
+    def test_get_nodes_waits_for_menu_built_by_another_process(self):
+        cache.clear()
+        menu_content = factories.MenuContentFactory()
+        child = factories.ChildMenuItemFactory(parent=menu_content.root)
+        nodes = {menu_content.menu.identifier: [
+            MenuNode(child.pk, menu_content.menu.root_id, "Built elsewhere", "/", "_self")
+        ]}
+        self._lock_menu(menu_content)
+
+        def sleep(seconds):
+            # The other process is done building the menu
+            navigation_cache.set_menus(1, "en", navigation_cache.PUBLISHED_STATE, nodes)
+
+        with patch.object(navigation_cache.time, "sleep", side_effect=sleep) as wait, \
+                patch.object(self.menu, "build_menus", wraps=self.menu.build_menus) as build_menus:
+            result = self.menu.get_nodes(self.request)
+
+        wait.assert_called_once()
+        build_menus.assert_not_called()
+        self.assertListEqual([node.title for node in result], ["", "Built elsewhere"])
+
+    @patch("djangocms_navigation.cms_menus.REBUILD_WAIT", 0)
+    @disable_versioning_for_navigation()
+    def test_get_nodes_builds_locked_menu_once_done_waiting(self):
+        cache.clear()
+        menu_content = factories.MenuContentFactory()
+        child = factories.ChildMenuItemFactory(parent=menu_content.root)
+        self._lock_menu(menu_content)
+
+        with patch.object(self.menu, "build_menus", wraps=self.menu.build_menus) as build_menus:
+            result = self.menu.get_nodes(self.request)
+
+        build_menus.assert_called_once_with([menu_content.root])
+        self.assertIn(child.pk, [node.id for node in result])
+
+    @disable_versioning_for_navigation()
+    def test_get_nodes_releases_lock_of_built_menus(self):
+        cache.clear()
+        menu_content = factories.MenuContentFactory()
+        factories.ChildMenuItemFactory(parent=menu_content.root)
+
+        self.menu.get_nodes(self.request)
+
+        key = navigation_cache.get_lock_key(
+            1, "en", menu_content.menu.identifier, navigation_cache.PUBLISHED_STATE
+        )
+        self.assertIsNone(cache.get(key))
+
+    @override_settings(DJANGOCMS_NAVIGATION_LANGUAGE_FALLBACKS=False)
+    @disable_versioning_for_navigation()
+    def test_get_roots_filters_by_request_language(self):
+        english = factories.MenuContentFactory(language="en")
+        factories.MenuContentFactory(language="de")
+
+        roots = self.menu.get_roots(self.request)
+
+        self.assertListEqual(list(roots), [english.root])
+
+    @override_settings(DJANGOCMS_NAVIGATION_LANGUAGE_FALLBACKS={"en": ["de", "fr"]})
+    def test_get_languages_with_configured_fallbacks(self):
+        self.assertListEqual(self.menu.get_languages(), ["en", "de", "fr"])
+
+    @override_settings(DJANGOCMS_NAVIGATION_LANGUAGE_FALLBACKS=False)
+    def test_get_languages_without_fallbacks(self):
+        self.assertListEqual(self.menu.get_languages(), ["en"])
+
+    @override_settings(DJANGOCMS_NAVIGATION_LANGUAGE_FALLBACKS={"en": ["de"]})
+    @disable_versioning_for_navigation()
+    def test_get_nodes_prefers_request_language_over_fallbacks(self):
+        cache.clear()
+        german_menu = factories.MenuContentFactory(language="de")
+        english = factories.MenuContentFactory(language="en")
+        factories.MenuContentFactory(menu=english.menu, language="de")
+        factories.MenuContentFactory(language="fr")
+        english_child = factories.ChildMenuItemFactory(parent=english.root)
+
+        nodes = self.menu.get_nodes(self.request)
+
+        self.assertListEqual(
+            [node.id for node in nodes],
+            [german_menu.menu.root_id, english.menu.root_id, english_child.pk],
+        )
+
+    @disable_versioning_for_navigation()
+    def test_get_roots_with_namespace(self):
+        menu_contents = factories.MenuContentFactory.create_batch(2)
+
+        roots = self.menu.get_roots(
+            self.request, namespace=menu_contents[1].menu.root_id
+        )
+
+        self.assertListEqual(list(roots), [menu_contents[1].root])
+
+    @disable_versioning_for_navigation()
+    def test_get_roots_with_unknown_namespace(self):
+        factories.MenuContentFactory()
+
+        roots = self.menu.get_roots(self.request, namespace="CMSMenu")
+
+        self.assertFalse(roots.exists())
+
+    @disable_versioning_for_navigation()
+    def test_get_nodes_with_navigation_renderer_only_builds_its_menu(self):
+        cache.clear()
+        menu_contents = factories.MenuContentFactory.create_batch(2)
+        factories.ChildMenuItemFactory(parent=menu_contents[0].root)
+        child = factories.ChildMenuItemFactory(parent=menu_contents[1].root)
+        renderer = NavigationMenuRenderer(
+            menu_pool, self.request, namespace=menu_contents[1].menu.root_id
+        )
+
+        nodes = CMSMenu(renderer).get_nodes(self.request)
+
+        self.assertListEqual(
+            [node.id for node in nodes], [menu_contents[1].menu.root_id, child.pk]
+        )
@@ -400,6 +400,13 @@ class MenuContentFormTestCase(CMSTestCase):
             queryset, expected_content_type_pks, lambda o: o.pk, ordered=False
         )
 
+    def test_object_id_widget_has_menu_language(self):
+        menu_content = factories.MenuContentFactory(language="fr")
+
+        form = MenuItemForm(menu_root=menu_content.root)
+
+        self.assertEqual(form.fields["object_id"].widget.attrs["data-language"], "fr")
+
     def test_content_type_select_widget_build_attrs(self):
         class TestForm(forms.Form):
             dummy_field = forms.CharField(label="dummy", required=False)
@@ -0,0 +1,144 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from cms import operations
+from cms.models import Page, User
+
+from djangocms_versioning.constants import OPERATION_PUBLISH, PUBLISHED
+
+from djangocms_navigation.cache import DRAFT_STATE
+from djangocms_navigation.handlers import (
+    purge_navigation_cache_on_content_change,
+    purge_navigation_cache_on_page_operation,
+)
+from djangocms_navigation.models import MenuContent
+from djangocms_navigation.test_utils import factories
+from djangocms_navigation.test_utils.app_1.models import TestModel1
+
+
+@patch("djangocms_navigation.handlers.purge_menu_cache")
+class MenuCachePurgeHandlersTestCase(TestCase):
+    def test_menu_item_save_purges_its_menu(self, mocked_purge):
+        menu_content = factories.MenuContentFactory()
+        item = factories.ChildMenuItemFactory(parent=menu_content.root)
+        mocked_purge.reset_mock()
+
+        item.title = "New title"
+        item.save()
+
+        mocked_purge.assert_called_once_with(
+            site_id=menu_content.menu.site_id, menu=menu_content.menu, state=DRAFT_STATE
+        )
+
+    def test_menu_item_delete_purges_its_menu(self, mocked_purge):
+        menu_content = factories.MenuContentFactory()
+        item = factories.ChildMenuItemFactory(parent=menu_content.root)
+        mocked_purge.reset_mock()
+
+        item.delete()
+
+        mocked_purge.assert_called_once_with(
+            site_id=menu_content.menu.site_id, menu=menu_content.menu, state=DRAFT_STATE
+        )
+
+    def test_published_menu_item_save_purges_all_states(self, mocked_purge):
+        menu_content = factories.MenuContentWithVersionFactory(version__state=PUBLISHED)
+        item = factories.ChildMenuItemFactory(parent=menu_content.root)
+        mocked_purge.reset_mock()
+
+        item.save()
+
+        mocked_purge.assert_called_once_with(
+            site_id=menu_content.menu.site_id, menu=menu_content.menu, state=None
+        )
+
+    def test_subtree_delete_purges_its_menu_once(self, mocked_purge):
+        menu_content = factories.MenuContentFactory()
+        item = factories.ChildMenuItemFactory(parent=menu_content.root)
+        child = factories.ChildMenuItemFactory(parent=item)
+        factories.ChildMenuItemFactory(parent=child)
+        mocked_purge.reset_mock()
+
+        item.delete()
+
+        mocked_purge.assert_called_once_with(
+            site_id=menu_content.menu.site_id, menu=menu_content.menu, state=DRAFT_STATE
+        )
+
+    def test_root_item_without_menu_content_does_not_purge(self, mocked_purge):
+        factories.RootMenuItemFactory()
+
+        mocked_purge.assert_not_called()
+
+    def test_menu_content_save_purges_its_menu(self, mocked_purge):
+        menu_content = factories.MenuContentFactory()
+
+        mocked_purge.assert_called_once_with(
+            site_id=menu_content.menu.site_id, menu=menu_content.menu, state=DRAFT_STATE
+        )
+
+
+@patch("djangocms_navigation.handlers.invalidate_site")
+class PageOperationHandlersTestCase(TestCase):
+    def _send_operation(self, operation, page):
+        purge_navigation_cache_on_page_operation(
+            sender=Page, operation=operation, request=None, token="token", obj=page
+        )
+
+    def test_page_move_invalidates_menus_of_its_site(self, mocked_invalidate):
+        page = factories.PageContentFactory().page
+
+        self._send_operation(operations.MOVE_PAGE, page)
+
+        mocked_invalidate.assert_called_once_with(page.node.site_id)
+
+    def test_page_delete_invalidates_menus_of_its_site(self, mocked_invalidate):
+        page = factories.PageContentFactory().page
+
+        self._send_operation(operations.DELETE_PAGE, page)
+
+        mocked_invalidate.assert_called_once_with(page.node.site_id)
+
+    def test_other_page_operations_keep_menus(self, mocked_invalidate):
+        page = factories.PageContentFactory().page
+
+        self._send_operation(operations.CHANGE_PAGE, page)
+
+        mocked_invalidate.assert_not_called()
+
+
+@patch("djangocms_navigation.handlers.delete_snapshots")
+@patch("djangocms_navigation.handlers.invalidate_site")
+class ContentOperationHandlersTestCase(TestCase):
+    def test_page_publish_invalidates_menus_of_its_site(self, mocked_invalidate, mocked_delete):
+        version = factories.PageVersionFactory()
+
+        purge_navigation_cache_on_content_change(
+            sender=version.content.__class__, operation=OPERATION_PUBLISH, token="token", obj=version
+        )
+
+        site_id = version.content.page.node.site_id
+        mocked_invalidate.assert_called_once_with(site_id)
+        mocked_delete.assert_called_once_with(site_id=site_id)
+
+    def test_publish_of_content_menus_cannot_link_to_keeps_menus(self, mocked_invalidate, mocked_delete):
+        purge_navigation_cache_on_content_change(
+            sender=MenuContent, operation=OPERATION_PUBLISH, token="token", obj=None
+        )
+        purge_navigation_cache_on_content_change(
+            sender=User, operation=OPERATION_PUBLISH, token="token", obj=None
+        )
+
+        mocked_invalidate.assert_not_called()
+        mocked_delete.assert_not_called()
+
+    def test_publish_of_linkable_content_without_site_invalidates_all_sites(
+        self, mocked_invalidate, mocked_delete
+    ):
+        purge_navigation_cache_on_content_change(
+            sender=TestModel1, operation=OPERATION_PUBLISH, token="token", obj=None
+        )
+
+        mocked_invalidate.assert_called_once_with(None)
+        mocked_delete.assert_called_once_with(site_id=None)
@@ -1,5 +1,6 @@
 from django.test import TestCase
 
+from djangocms_navigation.models import Menu
 from djangocms_navigation.test_utils import factories
 
 
@@ -13,6 +14,12 @@ class MenuModelTestCase(TestCase):
             menu__identifier='black-cats').menu
         self.assertEqual(menu.root_id, 'root-black-cats')
 
+    def test_get_identifier_from_root_id(self):
+        self.assertEqual(
+            Menu.get_identifier_from_root_id('root-black-cats'), 'black-cats'
+        )
+        self.assertIsNone(Menu.get_identifier_from_root_id('CMSMenu'))
+
 
 class MenuContentModelTestCase(TestCase):
 
@@ -0,0 +1,42 @@
+import pickle
+
+from django.test import SimpleTestCase
+
+from djangocms_navigation.nodes import MenuNode
+
+
+class MenuNodeTestCase(SimpleTestCase):
+    def test_has_no_instance_dict(self):
+        node = MenuNode(1, "root", "Fruit", "/fruit/", "_self")
+
+        self.assertFalse(hasattr(node, "__dict__"))
+
+    def test_link_targets_are_shared(self):
+        first = MenuNode(1, "root", "Fruit", "/fruit/", "".join(["_bl", "ank"]))
+        second = MenuNode(2, "root", "Apples", "/apples/", "".join(["_bla", "nk"]))
+
+        self.assertIs(first.link_target, second.link_target)
+
+    def test_pickle_round_trip(self):
+        node = MenuNode(2, 1, "Apples", "/fruit/apples/", "_blank")
+
+        self.assertEqual(pickle.loads(pickle.dumps(node)), node)
+
+    def test_to_navigation_node(self):
+        navigation_node = MenuNode(2, 1, "Apples", "/fruit/apples/", "_blank").to_navigation_node()
+
+        self.assertEqual(
+            (
+                navigation_node.id,
+                navigation_node.parent_id,
+                navigation_node.title,
+                navigation_node.url,
+                navigation_node.attr,
+            ),
+            (2, 1, "Apples", "/fruit/apples/", {"link_target": "_blank"}),
+        )
+
+    def test_navigation_nodes_do_not_share_attr(self):
+        node = MenuNode(2, 1, "Apples", "/fruit/apples/", "_blank")
+
+        self.assertIsNot(node.to_navigation_node().attr, node.to_navigation_node().attr)
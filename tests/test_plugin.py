@@ -1,3 +1,4 @@
+from types import SimpleNamespace
 from unittest.mock import patch
 
 from django.conf import settings
@@ -7,9 +8,15 @@ from cms.test_utils.testcases import CMSTestCase
 from menus.base import NavigationNode
 from menus.models import CacheKey
 
-from djangocms_navigation.cms_menus import NavigationSelector
+from djangocms_navigation.cms_menus import (
+    NavigationMenuRenderer,
+    NavigationSelector,
+    copy_nodes,
+)
+from djangocms_navigation.cms_plugins import Navigation
 from djangocms_navigation.models import NavigationPlugin
 from djangocms_navigation.test_utils import factories
+from djangocms_navigation.test_utils.benchmarks import render_navigation_plugin
 
 from .utils import disable_versioning_for_navigation
 
@@ -91,6 +98,99 @@ class NavigationSelectorTestCase(TestCase):
         # will be used as root - in this case fruit
         self.assertListEqual(result, [self.apples])
 
+    def test_modify_with_unknown_namespace(self):
+        result = self.selector.modify(
+            self.request,
+            nodes=self._get_nodes(),
+            namespace="root-sweets",
+            root_id=None,
+            post_cut=False,
+            breadcrumb=False,
+        )
+        self.assertListEqual(result, [])
+
+    def test_modify_indexes_root_positions_once_per_request(self):
+        self.selector = NavigationSelector(SimpleNamespace(cache_key="menu_nodes_en_1"))
+        self.selector.modify(
+            self.request,
+            nodes=self._get_nodes(),
+            namespace="root-vegetables",
+            root_id=None,
+            post_cut=False,
+            breadcrumb=False,
+        )
+        positions = self.request._navigation_root_positions["menu_nodes_en_1"]
+        self.assertDictEqual(positions, {"root-fruit": 0, "root-vegetables": 1})
+
+        # Another plugin of the same request has its own renderer, and gets
+        # a fresh copy of the nodes
+        selector = NavigationSelector(SimpleNamespace(cache_key="menu_nodes_en_1"))
+        result = selector.modify(
+            self.request,
+            nodes=self._get_nodes(),
+            namespace="root-fruit",
+            root_id=None,
+            post_cut=False,
+            breadcrumb=False,
+        )
+
+        self.assertListEqual(result, [self.apples])
+        self.assertIs(self.request._navigation_root_positions["menu_nodes_en_1"], positions)
+
+
+class NavigationPluginRenderTestCase(TestCase):
+    def test_render_only_builds_nodes_of_plugin_menu(self):
+        request = RequestFactory().get("/")
+        request.user = factories.UserFactory()
+        menu = factories.MenuFactory()
+        plugin = NavigationPlugin(menu=menu)
+
+        context = Navigation(NavigationPlugin).render({"request": request}, plugin, None)
+
+        renderer = context["cms_menu_renderer"]
+        self.assertIsInstance(renderer, NavigationMenuRenderer)
+        self.assertEqual(renderer.navigation_namespace, menu.root_id)
+        self.assertListEqual(list(renderer.menus), ["CMSMenu"])
+        self.assertTrue(renderer.cache_key.endswith(menu.root_id))
+
+    @disable_versioning_for_navigation()
+    def test_render_builds_nodes_once_per_request_and_menu(self):
+        request = RequestFactory().get("/")
+        request.user = factories.UserFactory()
+        header, footer = factories.MenuContentFactory.create_batch(2)
+        factories.ChildMenuItemFactory(parent=header.root)
+        factories.ChildMenuItemFactory(parent=footer.root)
+
+        first = render_navigation_plugin(request, header.menu)
+        render_navigation_plugin(request, footer.menu)
+        # e.g. the header menu repeated for mobile devices
+        with self.assertNumQueries(0):
+            html = render_navigation_plugin(request, header.menu)
+
+        self.assertEqual(html, first)
+        self.assertEqual(len(request.navigation_node_loads), 2)
+        self.assertSetEqual(set(request.navigation_node_loads.values()), {1})
+
+
+class CopyNodesTestCase(TestCase):
+    def test_copies_are_linked_to_each_other(self):
+        root = NavigationNode(title="", url="", id="root-fruit", attr={})
+        apples = NavigationNode(
+            title="Apples", url="/apples/", id=1, parent_id="root-fruit", attr={"link_target": "_self"}
+        )
+        apples.parent = root
+        root.children = [apples]
+        nodes = [root, apples]
+
+        root_copy, apples_copy = copy_nodes(nodes)
+
+        self.assertIsNot(root_copy, root)
+        self.assertIsNot(apples_copy, apples)
+        self.assertIs(apples_copy.parent, root_copy)
+        self.assertListEqual(root_copy.children, [apples_copy])
+        self.assertEqual(apples_copy.attr, apples.attr)
+        self.assertIsNot(apples_copy.attr, apples.attr)
+
 
 class NavigationPluginViewTestCase(CMSTestCase):
     def setUp(self):
@@ -297,8 +397,9 @@ class NavigationPluginViewTestCase(CMSTestCase):
         response = self.client.get(page_url)
 
         cache_key = CacheKey.objects.all().count()
-        # Rendering should generate cachekey object
-        self.assertEqual(cache_key, 1)
+        # Rendering should generate cachekey objects, one for the menu of
+        # the page template and one for the menu of the navigation plugin
+        self.assertEqual(cache_key, 2)
 
         # Check http response is ok
         self.assertEqual(response.status_code, 200)
@@ -348,8 +449,9 @@ class NavigationPluginViewTestCase(CMSTestCase):
 
         cache_key = CacheKey.objects.all().count()
         self.assertEqual(response.status_code, 200)
-        # Rendering should generate cachekey object
-        self.assertEqual(cache_key, 1)
+        # Rendering should generate cachekey objects, one for the menu of
+        # the page template and one for the menu of the navigation plugin
+        self.assertEqual(cache_key, 2)
 
         menu_content_version.publish(user=self.get_superuser())
 
@@ -394,8 +496,9 @@ class NavigationPluginViewTestCase(CMSTestCase):
 
         cache_key = CacheKey.objects.all().count()
         self.assertEqual(response.status_code, 200)
-        # Rendering should generate cachekey object
-        self.assertEqual(cache_key, 1)
+        # Rendering should generate cachekey objects, one for the menu of
+        # the page template and one for the menu of the navigation plugin
+        self.assertEqual(cache_key, 2)
 
         menu_content_version.unpublish(user=self.get_superuser())
 
@@ -439,8 +542,9 @@ class NavigationPluginViewTestCase(CMSTestCase):
         cache_key = CacheKey.objects.all().count()
 
         self.assertEqual(response.status_code, 200)
-        # Rendering should generate cachekey object
-        self.assertEqual(cache_key, 1)
+        # Rendering should generate cachekey objects, one for the menu of
+        # the page template and one for the menu of the navigation plugin
+        self.assertEqual(cache_key, 2)
 
         menu_content_version.archive(user=self.get_superuser())
 
@@ -0,0 +1,122 @@
+import threading
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from djangocms_navigation import rebuild
+
+
+class ScheduleTestCase(SimpleTestCase):
+    def _wait_for_rebuilds(self):
+        # The single worker runs the tasks in order
+        rebuild.get_executor().submit(lambda: None).result(timeout=5)
+
+    def test_concurrent_requests_schedule_a_single_rebuild(self):
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def build(identifier):
+            calls.append(identifier)
+            started.set()
+            release.wait(timeout=5)
+
+        results = []
+
+        def request():
+            results.append(rebuild.schedule(("food", "en"), build, "food"))
+
+        threads = [threading.Thread(target=request) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertTrue(started.wait(timeout=5))
+        # Requests coming in during the rebuild don't schedule another one
+        self.assertFalse(rebuild.schedule(("food", "en"), build, "food"))
+        release.set()
+        self._wait_for_rebuilds()
+
+        self.assertEqual(results.count(True), 1)
+        self.assertListEqual(calls, ["food"])
+        self.assertFalse(rebuild.is_pending(("food", "en")))
+
+    def test_menus_are_rebuilt_again_once_done(self):
+        calls = []
+
+        rebuild.schedule(("food", "en"), calls.append, 1)
+        self._wait_for_rebuilds()
+        rebuild.schedule(("food", "en"), calls.append, 2)
+        self._wait_for_rebuilds()
+
+        self.assertListEqual(calls, [1, 2])
+
+    def test_failed_rebuild_is_not_pending(self):
+        def build():
+            raise ValueError
+
+        with patch.object(rebuild.logger, "exception") as log:
+            rebuild.schedule(("food", "en"), build)
+            self._wait_for_rebuilds()
+
+        log.assert_called_once()
+        self.assertFalse(rebuild.is_pending(("food", "en")))
+
+
+class LockTestCase(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.key = "djangocms_navigation:1:lock:en:published:food"
+
+    def test_lock_is_held_until_released(self):
+        token = rebuild.acquire_lock(self.key)
+
+        self.assertIsNotNone(token)
+        self.assertIsNone(rebuild.acquire_lock(self.key))
+        rebuild.release_lock(self.key, token)
+        token = rebuild.acquire_lock(self.key)
+        self.assertIsNotNone(token)
+        rebuild.release_lock(self.key, token)
+
+    def test_lock_held_by_another_process(self):
+        cache.add(self.key, "another process")
+
+        self.assertIsNone(rebuild.acquire_lock(self.key))
+
+    def test_release_keeps_lock_taken_over_by_another_process(self):
+        token = rebuild.acquire_lock(self.key)
+        # The lock timed out and was taken by another process
+        cache.set(self.key, "another process")
+
+        rebuild.release_lock(self.key, token)
+
+        self.assertEqual(cache.get(self.key), "another process")
+
+    def test_lock_falls_back_to_process_when_cache_fails(self):
+        with patch.object(rebuild.cache, "add", side_effect=ConnectionError), \
+                patch.object(rebuild.logger, "warning"):
+            token = rebuild.acquire_lock(self.key)
+            # Other threads of the process still wait for the lock
+            self.assertIsNone(rebuild.acquire_lock(self.key))
+
+        self.assertIsNotNone(token)
+        rebuild.release_lock(self.key, token)
+
+    def test_concurrent_threads_take_lock_once(self):
+        tokens = []
+        barrier = threading.Barrier(10)
+
+        def request():
+            barrier.wait(timeout=5)
+            tokens.append(rebuild.acquire_lock(self.key))
+
+        threads = [threading.Thread(target=request) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        acquired = [token for token in tokens if token is not None]
+        self.assertEqual(len(acquired), 1)
+        rebuild.release_lock(self.key, acquired[0])
@@ -0,0 +1,147 @@
+from unittest import skipIf, skipUnless
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DatabaseError, connection, transaction
+from django.test import TestCase
+
+from cms.models import Page
+
+from djangocms_versioning.constants import (
+    ARCHIVED,
+    DRAFT,
+    PUBLISHED,
+    UNPUBLISHED,
+)
+
+from djangocms_navigation.search import (
+    PageContentSearch,
+    PrefixSearch,
+    TrigramSearch,
+    get_search_backend,
+)
+from djangocms_navigation.test_utils.factories import (
+    PageContentFactory,
+    PageContentWithVersionFactory,
+)
+from djangocms_navigation.test_utils.polls.models import Poll, PollContent
+
+
+class GetSearchBackendTestCase(TestCase):
+    def test_fields_use_prefix_search(self):
+        self.assertEqual(get_search_backend(["text"]), PrefixSearch(["text"]))
+
+    def test_no_fields_use_prefix_search_without_fields(self):
+        self.assertEqual(get_search_backend(None), PrefixSearch([]))
+
+    def test_backend_is_returned(self):
+        backend = TrigramSearch(["text"])
+
+        self.assertIs(get_search_backend(backend), backend)
+
+
+class PrefixSearchTestCase(TestCase):
+    def setUp(self):
+        poll = Poll.objects.create(name="Poll")
+        self.apple = PollContent.objects.create(poll=poll, language="en", text="Apple")
+        self.pineapple = PollContent.objects.create(poll=poll, language="en", text="Pineapple")
+
+    def test_matches_start_of_field(self):
+        queryset = PrefixSearch(["text"]).search(PollContent.objects.all(), "app")
+
+        self.assertQuerysetEqual(queryset, [self.apple.pk], lambda o: o.pk)
+
+    def test_matches_any_field(self):
+        queryset = PrefixSearch(["text", "poll__name"]).search(PollContent.objects.all(), "pol")
+
+        self.assertQuerysetEqual(
+            queryset.order_by("pk"), [self.apple.pk, self.pineapple.pk], lambda o: o.pk
+        )
+
+    def test_without_fields_does_not_filter(self):
+        queryset = PrefixSearch([]).search(PollContent.objects.all(), "xyz")
+
+        self.assertEqual(queryset.count(), 2)
+
+    def test_page_matched_by_several_contents_is_returned_once(self):
+        page_content = PageContentFactory(title="Test", language="en")
+        PageContentFactory(page=page_content.page, title="Test fr", language="fr")
+
+        queryset = PrefixSearch(["pagecontent_set__title"]).search(Page.objects.all(), "test")
+
+        self.assertQuerysetEqual(queryset, [page_content.page.pk], lambda o: o.pk)
+
+
+class PageContentSearchTestCase(TestCase):
+    def setUp(self):
+        self.backend = PageContentSearch(["title"])
+
+    def _search(self, query, language=None):
+        return list(self.backend.search(Page.objects.order_by("pk"), query, language))
+
+    def test_page_with_several_matching_contents_is_returned_once(self):
+        page_content = PageContentWithVersionFactory(title="Test", language="en")
+        PageContentWithVersionFactory(page=page_content.page, title="Test fr", language="fr")
+
+        self.assertEqual(self._search("test"), [page_content.page])
+
+    def test_search_is_restricted_to_language(self):
+        en = PageContentWithVersionFactory(title="Test", language="en")
+        fr = PageContentWithVersionFactory(title="Test", language="fr")
+
+        self.assertEqual(self._search("test", "fr"), [fr.page])
+        self.assertEqual(self._search("test", "en"), [en.page])
+
+    def test_search_is_restricted_to_draft_and_published_contents(self):
+        draft = PageContentWithVersionFactory(title="Test", language="en", version__state=DRAFT)
+        published = PageContentWithVersionFactory(title="Test", language="en", version__state=PUBLISHED)
+        PageContentWithVersionFactory(title="Test", language="en", version__state=ARCHIVED)
+        PageContentWithVersionFactory(title="Test", language="en", version__state=UNPUBLISHED)
+
+        self.assertEqual(self._search("test"), [draft.page, published.page])
+
+    def test_label_is_matched_title(self):
+        page_content = PageContentWithVersionFactory(title="Test", language="en")
+        PageContentWithVersionFactory(page=page_content.page, title="Essai", language="fr")
+
+        with self.assertNumQueries(1):
+            pages = self._search("ess", "fr")
+            self.assertEqual([self.backend.get_label(page) for page in pages], ["Essai"])
+
+    def test_without_query_all_pages_are_labelled(self):
+        first = PageContentWithVersionFactory(title="First", language="en")
+        second = PageContentWithVersionFactory(title="Second", language="en")
+
+        with self.assertNumQueries(1):
+            pages = self._search(None, "en")
+            self.assertEqual(pages, [first.page, second.page])
+            self.assertEqual([self.backend.get_label(page) for page in pages], ["First", "Second"])
+
+
+@skipIf(connection.vendor == "postgresql", "TrigramSearch is supported on PostgreSQL")
+class TrigramSearchTestCase(TestCase):
+    def test_requires_postgresql(self):
+        with self.assertRaises(ImproperlyConfigured):
+            TrigramSearch(["text"]).search(PollContent.objects.all(), "app")
+
+
+@skipUnless(connection.vendor == "postgresql", "TrigramSearch requires PostgreSQL")
+class PostgresTrigramSearchTestCase(TestCase):
+    def setUp(self):
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        except DatabaseError:
+            self.skipTest("The pg_trgm extension is not available")
+        poll = Poll.objects.create(name="Poll")
+        self.banana = PollContent.objects.create(poll=poll, language="en", text="Banana")
+        self.pineapple = PollContent.objects.create(poll=poll, language="en", text="Pineapple")
+
+    def test_matches_similar_text(self):
+        queryset = TrigramSearch(["text"]).search(PollContent.objects.all(), "pinapple")
+
+        self.assertQuerysetEqual(queryset, [self.pineapple.pk], lambda o: o.pk)
+
+    def test_matches_start_of_field(self):
+        queryset = TrigramSearch(["text"]).search(PollContent.objects.all(), "ba")
+
+        self.assertQuerysetEqual(queryset, [self.banana.pk], lambda o: o.pk)
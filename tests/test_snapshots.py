@@ -0,0 +1,145 @@
+import json
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from cms import operations
+from cms.models import Page
+from cms.utils.conf import get_cms_setting
+from menus.menu_pool import menu_pool
+
+from djangocms_navigation.cms_menus import CMSMenu
+from djangocms_navigation.handlers import (
+    purge_navigation_cache_on_page_operation,
+)
+from djangocms_navigation.models import MenuSnapshot
+from djangocms_navigation.snapshots import get_menus
+from djangocms_navigation.test_utils import factories
+from djangocms_navigation.utils import purge_menu_cache
+
+
+try:
+    from djangocms_versioning.constants import PUBLISHED
+except ImportError:
+    PUBLISHED = None
+
+
+class MenuSnapshotTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = factories.UserFactory()
+        self.request = RequestFactory().get("/")
+        self.request.user = self.user
+        self.menu = CMSMenu(menu_pool.get_renderer(self.request))
+
+    @override_settings(DJANGOCMS_NAVIGATION_LANGUAGE_FALLBACKS={"de": ["en"], "fr": ["it"]})
+    def test_publish_snapshots_menu_in_the_languages_it_is_shown_in(self):
+        version = factories.MenuVersionFactory(created_by=self.user)
+        child = factories.ChildMenuItemFactory(parent=version.content.root)
+
+        version.publish(self.user)
+
+        # The english menu is also shown in german, which falls back to it
+        snapshots = MenuSnapshot.objects.filter(menu_content=version.content)
+        self.assertSetEqual(
+            set(snapshots.values_list("language", flat=True)), {"en", "de"}
+        )
+        nodes = json.loads(snapshots.get(language="en").nodes)
+        self.assertListEqual(
+            nodes,
+            [[
+                child.pk,
+                version.content.menu.root_id,
+                child.title,
+                child.content.get_absolute_url(),
+                child.link_target,
+            ]],
+        )
+
+    def test_get_nodes_reads_published_menu_from_snapshot(self):
+        version = factories.MenuVersionFactory(created_by=self.user)
+        child = factories.ChildMenuItemFactory(parent=version.content.root)
+        version.publish(self.user)
+        cache.clear()
+
+        # One query for the roots and one for their snapshots
+        with self.assertNumQueries(2):
+            nodes = self.menu.get_nodes(self.request)
+
+        self.assertListEqual(
+            [(node.id, node.parent_id, node.url) for node in nodes],
+            [
+                (version.content.menu.root_id, None, ""),
+                (child.pk, version.content.menu.root_id, child.content.get_absolute_url()),
+            ],
+        )
+
+    def test_get_nodes_snapshots_built_menus(self):
+        version = factories.MenuVersionFactory(state=PUBLISHED)
+        factories.ChildMenuItemFactory(parent=version.content.root)
+
+        self.menu.get_nodes(self.request)
+
+        self.assertTrue(
+            MenuSnapshot.objects.filter(
+                menu_content=version.content, language="en"
+            ).exists()
+        )
+
+    def test_purge_menu_cache_deletes_snapshots_of_menu(self):
+        published = factories.MenuVersionFactory(created_by=self.user)
+        other = factories.MenuVersionFactory(created_by=self.user)
+        published.publish(self.user)
+        other.publish(self.user)
+
+        purge_menu_cache(
+            site_id=published.content.menu.site_id, menu=published.content.menu
+        )
+
+        self.assertFalse(
+            MenuSnapshot.objects.filter(menu_content=published.content).exists()
+        )
+        self.assertTrue(
+            MenuSnapshot.objects.filter(menu_content=other.content).exists()
+        )
+
+    def test_page_move_deletes_snapshots_of_its_site(self):
+        version = factories.MenuVersionFactory(created_by=self.user)
+        version.publish(self.user)
+        page = factories.PageContentFactory().page
+
+        purge_navigation_cache_on_page_operation(
+            sender=Page, operation=operations.MOVE_PAGE, request=None, token="token", obj=page
+        )
+
+        self.assertFalse(MenuSnapshot.objects.exists())
+
+    @patch("djangocms_navigation.snapshots.SNAPSHOT_MAX_AGE", 60)
+    def test_expired_snapshot_is_rebuilt(self):
+        version = factories.MenuVersionFactory(created_by=self.user)
+        child = factories.ChildMenuItemFactory(parent=version.content.root)
+        version.publish(self.user)
+        MenuSnapshot.objects.update(
+            created=timezone.now() - timedelta(seconds=61), nodes="[]"
+        )
+        cache.clear()
+
+        nodes = self.menu.get_nodes(self.request)
+
+        self.assertIn(child.pk, [node.id for node in nodes])
+        snapshot = MenuSnapshot.objects.get(menu_content=version.content, language="en")
+        self.assertIn(child.title, snapshot.nodes)
+
+    @patch("djangocms_navigation.snapshots.SNAPSHOT_MAX_AGE", None)
+    def test_snapshots_expire_with_the_menu_cache_by_default(self):
+        version = factories.MenuVersionFactory(created_by=self.user)
+        version.publish(self.user)
+        duration = get_cms_setting("CACHE_DURATIONS")["menus"]
+        MenuSnapshot.objects.update(created=timezone.now() - timedelta(seconds=duration + 1))
+        root = version.content.root
+
+        self.assertDictEqual(get_menus([root], "en"), {})
@@ -2,16 +2,19 @@ from unittest.mock import Mock, patch
 
 from django.apps import apps
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
 from django.test import TestCase
 
 from cms.models import Page, User
 
+from djangocms_navigation import cache as navigation_cache, instrumentation
 from djangocms_navigation.models import MenuContent
 from djangocms_navigation.test_utils.app_1.models import TestModel1, TestModel2
 from djangocms_navigation.test_utils.app_2.models import TestModel3, TestModel4
 from djangocms_navigation.test_utils.polls.models import PollContent
 from djangocms_navigation.utils import (
     is_model_supported,
+    purge_menu_cache,
     supported_content_type_pks,
     supported_models,
 )
@@ -84,3 +87,40 @@ class IsModelSupportedTestCase(TestCase):
         unexpected_content_types = ContentType.objects.get_for_models(User)
         for model in unexpected_content_types:
             self.assertFalse(is_model_supported(MenuContent, model))
+
+
+class PurgeMenuCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    @patch("djangocms_navigation.utils.menu_pool")
+    def test_purges_are_counted(self, mocked_menu_pool):
+        purge_menu_cache(site_id=1)
+        purge_menu_cache(site_id=1)
+
+        self.assertEqual(mocked_menu_pool.clear.call_count, 2)
+        self.assertEqual(instrumentation.get_count(instrumentation.MENU_PURGES), 2)
+
+    @patch("djangocms_navigation.utils.navigation_cache")
+    @patch("djangocms_navigation.utils.menu_pool")
+    def test_purge_with_menu_only_invalidates_that_menu(
+        self, mocked_menu_pool, mocked_navigation_cache
+    ):
+        menu = Mock(site_id=1)
+
+        purge_menu_cache(site_id=1, menu=menu)
+
+        mocked_navigation_cache.invalidate_menu.assert_called_once_with(menu, state=None)
+        mocked_navigation_cache.invalidate_site.assert_not_called()
+        mocked_menu_pool.clear.assert_called_once_with(site_id=1, language=None)
+
+    @patch("djangocms_navigation.utils.snapshots")
+    @patch("djangocms_navigation.utils.menu_pool")
+    def test_purge_of_draft_state_keeps_snapshots(self, mocked_menu_pool, mocked_snapshots):
+        menu = Mock(site_id=1)
+
+        with patch("djangocms_navigation.utils.navigation_cache.invalidate_menu") as mocked_invalidate:
+            purge_menu_cache(site_id=1, menu=menu, state=navigation_cache.DRAFT_STATE)
+
+        mocked_invalidate.assert_called_once_with(menu, state=navigation_cache.DRAFT_STATE)
+        mocked_snapshots.delete_snapshots.assert_not_called()
@@ -1,6 +1,16 @@
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
-from djangocms_navigation.models import MenuItem
+from djangocms_navigation.cms_config import (
+    _get_model_fields,
+    copy_menu_content,
+)
+from djangocms_navigation.constants import COPY_IN_DATABASE_VENDORS
+from djangocms_navigation.models import MenuContent, MenuItem
 from djangocms_navigation.test_utils import factories
 
 
@@ -101,3 +111,70 @@ class CopyFunctionTestCase(TestCase):
         ]
         new_paths = [item.path for item in MenuItem.get_tree(new_version.content.root)]
         self.assertListEqual(new_paths, expected_paths)
+
+    def _copy_menu_tree(self):
+        """Copy a menu content with five menu items
+
+        :return: the original and new roots, and the number of menu item
+        inserts of the copy
+        """
+        original_version = factories.MenuVersionFactory()
+        original_root = original_version.content.root
+        child = factories.ChildMenuItemFactory(parent=original_root)
+        factories.ChildMenuItemFactory(parent=child)
+        factories.SiblingMenuItemFactory(sibling=child)
+        factories.ChildMenuItemFactory(
+            parent=original_root, content=None, content_type=None, object_id=None
+        )
+        factories.ChildMenuItemFactory(parent=child)
+
+        with CaptureQueriesContext(connection) as queries:
+            new_content = copy_menu_content(original_version.content)
+
+        insert = 'INSERT INTO "{}"'.format(MenuItem._meta.db_table)
+        inserts = sum(query["sql"].startswith(insert) for query in queries.captured_queries)
+        return original_root, new_content.root, inserts
+
+    def assertTreeCopied(self, original_root, new_root):
+        fields = ["path", "depth", "numchild", "title", "link_target", "content_type_id", "object_id"]
+        original_items = MenuItem.get_tree(original_root).exclude(pk=original_root.pk).values_list(*fields)
+        new_items = MenuItem.get_tree(new_root).exclude(pk=new_root.pk).values_list(*fields)
+        self.assertListEqual(
+            [(new_root.path + item[0][MenuItem.steplen:],) + item[1:] for item in original_items],
+            list(new_items),
+        )
+
+    @patch("djangocms_navigation.cms_config.COPY_IN_DATABASE", False)
+    @patch("djangocms_navigation.cms_config.COPY_BATCH_SIZE", 2)
+    def test_menu_items_are_copied_in_batches(self):
+        """Menu items are inserted COPY_BATCH_SIZE at a time and keep
+        their fields and position in the tree
+        """
+        original_root, new_root, inserts = self._copy_menu_tree()
+
+        # One insert for the root and three batches for the five items
+        self.assertEqual(inserts, 4)
+        self.assertTreeCopied(original_root, new_root)
+
+    @skipUnless(
+        connection.vendor in COPY_IN_DATABASE_VENDORS,
+        "The database doesn't support copying menu items with INSERT ... SELECT",
+    )
+    def test_menu_items_are_copied_in_database(self):
+        """Menu items are copied with a single INSERT ... SELECT and keep
+        their fields and position in the tree
+        """
+        original_root, new_root, inserts = self._copy_menu_tree()
+
+        # One insert for the root and one for the items
+        self.assertEqual(inserts, 2)
+        self.assertTreeCopied(original_root, new_root)
+
+    def test_get_model_fields_does_not_change_its_defaults(self):
+        menu_content = factories.MenuContentFactory()
+
+        _get_model_fields(menu_content, MenuContent, field_exclusion_list=["root"])
+        fields = _get_model_fields(menu_content, MenuContent)
+
+        self.assertIn("root", fields)
+        self.assertNotIn("id", fields)
@@ -1,5 +1,8 @@
+from unittest.mock import patch
+
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.sites.models import Site
+from django.core.cache import cache
 
 from cms.models import Page, User
 from cms.test_utils.testcases import CMSTestCase
@@ -10,6 +13,7 @@ from djangocms_navigation.models import MenuItem
 from djangocms_navigation.test_utils.factories import (
     MenuContentFactory,
     PageContentFactory,
+    PageContentWithVersionFactory,
 )
 from djangocms_navigation.test_utils.polls.models import Poll, PollContent
 
@@ -69,6 +73,7 @@ class PreviewViewTestCases(CMSTestCase):
 
 class ContentObjectAutoFillTestCases(CMSTestCase):
     def setUp(self):
+        cache.clear()
         self.select2_endpoint = admin_reverse(SELECT2_CONTENT_OBJECT_URL_NAME)
         self.superuser = self.get_superuser()
 
@@ -163,10 +168,10 @@ class ContentObjectAutoFillTestCases(CMSTestCase):
     def test_select2_view_search_text_page(self):
         """ Both pages should appear in results for test query"""
         page_contenttype_id = ContentType.objects.get_for_model(Page).id
-        PageContentFactory(
+        PageContentWithVersionFactory(
             title="test", menu_title="test", page_title="test", language="en"
         )
-        PageContentFactory(
+        PageContentWithVersionFactory(
             title="test2", menu_title="test2", page_title="test2", language="en"
         )
         with self.login_user_context(self.superuser):
@@ -181,10 +186,10 @@ class ContentObjectAutoFillTestCases(CMSTestCase):
     def test_select2_view_search_exact_text_page(self):
         """ One page should appear in results for test2 exact query"""
         page_contenttype_id = ContentType.objects.get_for_model(Page).id
-        PageContentFactory(
+        PageContentWithVersionFactory(
             title="test", menu_title="test", page_title="test", language="en"
         )
-        PageContentFactory(
+        PageContentWithVersionFactory(
             title="test2", menu_title="test2", page_title="test2", language="en"
         )
         with self.login_user_context(self.superuser):
@@ -197,6 +202,24 @@ class ContentObjectAutoFillTestCases(CMSTestCase):
         # our query should be in text of resultset
         self.assertIn("test2", response.json()["results"][0]["text"])
 
+    def test_select2_view_search_page_in_language(self):
+        """Only the contents in the requested language are searched and
+        the matched title is returned"""
+        page_contenttype_id = ContentType.objects.get_for_model(Page).id
+        page_content = PageContentWithVersionFactory(title="test", language="en")
+        PageContentWithVersionFactory(page=page_content.page, title="test fr", language="fr")
+        PageContentWithVersionFactory(title="test it", language="it")
+        with self.login_user_context(self.superuser):
+            response = self.client.get(
+                self.select2_endpoint,
+                data={"content_type_id": page_contenttype_id, "query": "test", "language": "fr"},
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()["results"], [{"text": "test fr", "id": page_content.page.pk}]
+        )
+
     def test_select2_view_dummy_search_text_page(self):
         """ query which doesnt match should return 0 results"""
         page_contenttype_id = ContentType.objects.get_for_model(Page).id
@@ -222,7 +245,8 @@ class ContentObjectAutoFillTestCases(CMSTestCase):
             )
         self.assertEqual(response.status_code, 200)
         expected_json = {
-            "results": [{"text": "example1", "id": 1}, {"text": "example2", "id": 2}]
+            "results": [{"text": "example1", "id": 1}, {"text": "example2", "id": 2}],
+            "more": False,
         }
         self.assertEqual(response.json(), expected_json)
 
@@ -244,5 +268,171 @@ class ContentObjectAutoFillTestCases(CMSTestCase):
                 },
             )
         self.assertEqual(response.status_code, 200)
-        expected_json = {"results": [{"text": "example", "id": 1}]}
+        expected_json = {"results": [{"text": "example", "id": 1}], "more": False}
         self.assertEqual(response.json(), expected_json)
+
+
+class ContentObjectSelect2PaginationTestCase(CMSTestCase):
+    def setUp(self):
+        cache.clear()
+        self.select2_endpoint = admin_reverse(SELECT2_CONTENT_OBJECT_URL_NAME)
+        self.superuser = self.get_superuser()
+        poll = Poll.objects.create(name="Test poll")
+        self.poll_contents = [
+            PollContent.objects.create(poll=poll, language="en", text="example{}".format(i))
+            for i in range(5)
+        ]
+        self.content_type_id = ContentType.objects.get_for_model(PollContent).id
+
+    def _get(self, **data):
+        with self.login_user_context(self.superuser):
+            response = self.client.get(
+                self.select2_endpoint, data=dict(data, content_type_id=self.content_type_id)
+            )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def _ids(self, poll_contents):
+        return [poll_content.pk for poll_content in poll_contents]
+
+    def test_first_page(self):
+        data = self._get(limit=2)
+
+        self.assertEqual([p["id"] for p in data["results"]], self._ids(self.poll_contents[:2]))
+        self.assertTrue(data["more"])
+
+    def test_page(self):
+        data = self._get(limit=2, page=2)
+
+        self.assertEqual([p["id"] for p in data["results"]], self._ids(self.poll_contents[2:4]))
+        self.assertTrue(data["more"])
+
+    def test_last_page(self):
+        data = self._get(limit=2, page=3)
+
+        self.assertEqual([p["id"] for p in data["results"]], self._ids(self.poll_contents[4:]))
+        self.assertFalse(data["more"])
+
+    def test_after_cursor(self):
+        data = self._get(limit=2, page=3, after=self.poll_contents[1].pk)
+
+        # The cursor takes precedence over the page
+        self.assertEqual([p["id"] for p in data["results"]], self._ids(self.poll_contents[2:4]))
+        self.assertTrue(data["more"])
+
+    def test_invalid_parameters_fall_back_to_the_first_page(self):
+        data = self._get(limit="all", page="-", after="x")
+
+        self.assertEqual([p["id"] for p in data["results"]], self._ids(self.poll_contents))
+        self.assertFalse(data["more"])
+
+    @patch("djangocms_navigation.views.SELECT2_MAX_PAGE_SIZE", 3)
+    def test_limit_is_capped(self):
+        data = self._get(limit=1000)
+
+        self.assertEqual([p["id"] for p in data["results"]], self._ids(self.poll_contents[:3]))
+        self.assertTrue(data["more"])
+
+
+class ContentObjectSelect2CacheTestCase(CMSTestCase):
+    def setUp(self):
+        cache.clear()
+        self.select2_endpoint = admin_reverse(SELECT2_CONTENT_OBJECT_URL_NAME)
+        self.superuser = self.get_superuser()
+        self.poll = Poll.objects.create(name="Test poll")
+        self.poll_content = PollContent.objects.create(poll=self.poll, language="en", text="example")
+        self.data = {
+            "content_type_id": ContentType.objects.get_for_model(PollContent).id,
+            "query": "exa",
+        }
+
+    def _get(self, data, **extra):
+        with self.login_user_context(self.superuser):
+            return self.client.get(self.select2_endpoint, data=data, **extra)
+
+    def test_response_is_cached(self):
+        self._get(self.data)
+        PollContent.objects.create(poll=self.poll, language="en", text="example2")
+
+        response = self._get(self.data)
+
+        self.assertEqual([p["id"] for p in response.json()["results"]], [self.poll_content.pk])
+
+    def test_response_cache_depends_on_parameters(self):
+        self._get(self.data)
+        poll_content = PollContent.objects.create(poll=self.poll, language="en", text="example2")
+
+        response = self._get(dict(self.data, query="example2"))
+
+        self.assertEqual([p["id"] for p in response.json()["results"]], [poll_content.pk])
+
+    @patch("djangocms_navigation.views.SELECT2_CACHE_TIMEOUT", 0)
+    def test_response_is_not_cached_without_timeout(self):
+        self._get(self.data)
+        poll_content = PollContent.objects.create(poll=self.poll, language="en", text="example2")
+
+        response = self._get(self.data)
+
+        self.assertEqual(
+            [p["id"] for p in response.json()["results"]], [self.poll_content.pk, poll_content.pk]
+        )
+
+    def test_etag(self):
+        etag = self._get(self.data)["ETag"]
+
+        response = self._get(self.data, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_etag_mismatch(self):
+        response = self._get(self.data, HTTP_IF_NONE_MATCH='"outdated"')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([p["id"] for p in response.json()["results"]], [self.poll_content.pk])
+
+    def test_pks_lookup_of_invalid_pks_returns_no_objects(self):
+        response = self._get({
+            "content_type_id": self.data["content_type_id"],
+            "pks": "invalid,abc",
+        })
+
+        self.assertEqual(response.json(), {"results": [], "more": False})
+
+    @patch("djangocms_navigation.views.SELECT2_MAX_PAGE_SIZE", 2)
+    def test_pks_lookup_is_not_capped_to_max_page_size(self):
+        poll_contents = [
+            PollContent.objects.create(poll=self.poll, language="en", text="example{}".format(i))
+            for i in range(3)
+        ]
+
+        response = self._get({
+            "content_type_id": self.data["content_type_id"],
+            "pks": ",".join(str(poll_content.pk) for poll_content in poll_contents),
+        })
+
+        data = response.json()
+        self.assertEqual(
+            [result["id"] for result in data["results"]],
+            [poll_content.pk for poll_content in poll_contents],
+        )
+        self.assertFalse(data["more"])
+
+    def test_pks_lookup(self):
+        poll_contents = [
+            PollContent.objects.create(poll=self.poll, language="en", text="example{}".format(i))
+            for i in range(3)
+        ]
+
+        response = self._get({
+            "content_type_id": self.data["content_type_id"],
+            "pks": "{},{},invalid".format(poll_contents[2].pk, self.poll_content.pk),
+        })
+
+        self.assertEqual(response.json(), {
+            "results": [
+                {"text": "example", "id": self.poll_content.pk},
+                {"text": "example2", "id": poll_contents[2].pk},
+            ],
+            "more": False,
+        })
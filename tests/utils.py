@@ -1,9 +1,13 @@
+import re
+from collections import Counter
 from contextlib import contextmanager
 
 from django.apps import apps
 from django.conf import UserSettingsHolder, settings
+from django.core.cache import cache
+from django.db import connection, transaction
 from django.test.signals import setting_changed
-from django.test.utils import TestContextDecorator
+from django.test.utils import CaptureQueriesContext, TestContextDecorator
 
 from djangocms_versioning.helpers import version_list_url_for_grouper
 
@@ -28,6 +32,57 @@ class UsefulAssertsMixin(object):
             raise self.failureException("{} raised".format(exc_type.__name__))
 
 
+def _normalize_sql(sql):
+    """Strip the literals out of a query, so that the same query run
+    with different parameters compares equal"""
+    return re.sub(r"'[^']*'|\b\d+\b", "?", sql)
+
+
+class QueryCountMixin(object):
+    def assertQueryCountConstant(self, setup, run, sizes=(1, 5, 20), max_queries=None):
+        """Asserts ``run(data)`` makes the same number of queries against
+        every ``data = setup(size)`` dataset, and no more than
+        ``max_queries`` when given.
+
+        ``run`` is called once before being measured, so that per process
+        caches (content types, sites...) are filled, and the default cache
+        is cleared in between. Each dataset is rolled back once measured.
+        """
+        captured = {}
+        for size in sizes:
+            with transaction.atomic():
+                data = setup(size)
+                run(data)
+                cache.clear()
+                with CaptureQueriesContext(connection) as queries:
+                    run(data)
+                captured[size] = [query["sql"] for query in queries.captured_queries]
+                transaction.set_rollback(True)
+
+        counts = {size: len(queries) for size, queries in captured.items()}
+        if max_queries is not None:
+            self.assertLessEqual(
+                max(counts.values()), max_queries,
+                "Query count {} exceeds the budget of {} queries:\n{}".format(
+                    counts, max_queries, "\n".join(captured[max(sizes)])
+                ),
+            )
+        if len(set(counts.values())) == 1:
+            return
+        smallest = Counter(map(_normalize_sql, captured[min(sizes)]))
+        largest = Counter(map(_normalize_sql, captured[max(sizes)]))
+        offending = [
+            "{} -> {} times: {}".format(smallest[sql], count, sql)
+            for sql, count in largest.items()
+            if count > smallest[sql]
+        ]
+        self.fail(
+            "Query count depends on the data size {}, queries run more often:\n{}".format(
+                counts, "\n".join(offending)
+            )
+        )
+
+
 class disable_versioning_for(TestContextDecorator):
     """
     Use this to remove content models from versioning for specific tests.